@@ -0,0 +1,86 @@
+"""
+Shows how building the report scales with the number of sheets (IDs) in a workbook, comparing the old
+pd.concat-per-sheet accumulation with the row list used by process_sheets().
+
+Usage:
+    python benchmarks/bench_accumulate.py [sheets] [rows per sheet]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import report_core  # noqa: E402
+from make_workbooks import write_stale_dimension_copy  # noqa: E402
+
+
+def make_workbook(file_path, sheets, rows_per_sheet, seed=0):
+    # Write-only mode, so writing thousands of sheets doesn't take longer than the benchmark itself
+    random.seed(seed)
+    wb = Workbook(write_only=True)
+    for sheet_index in range(sheets):
+        ws = wb.create_sheet(title=f'ID_{sheet_index}')
+        ws.append(['ID', 'CHS', 'RU'])
+        for row_index in range(rows_per_sheet):
+            ws.append([row_index, '攻击力提高{0}%' * random.randint(1, 3), 'перевод' if random.random() < 0.6 else None])
+    wb.save(file_path)
+
+
+def accumulate_with_concat(report_rows, report_headers):
+    # The accumulation process_excel_file() used before, kept for comparison
+    interim_df = pd.DataFrame(columns=report_headers)
+    for report_row in report_rows:
+        row_data = pd.DataFrame({column: [value] for column, value in report_row.items()})
+        interim_df = pd.concat([interim_df, row_data], ignore_index=True)
+    return interim_df
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    sheets = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rows_per_sheet = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    headers = report_core.report_headers_variable
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, 'synthetic.xlsx')
+        _, write_time = timed(make_workbook, file_path, sheets, rows_per_sheet)
+        all_sheets, load_time = timed(report_core.load_sheets_as_dict, file_path, 'CHS', 'RU')
+
+        # A wrong size record in the sheets must not change what is read, like with pd.read_excel()
+        stale_path = os.path.join(temp_dir, 'stale_dimension.xlsx')
+        write_stale_dimension_copy(file_path, stale_path)
+        stale_sheets = report_core.load_sheets_as_dict(stale_path, 'CHS', 'RU')
+        assert list(stale_sheets) == list(all_sheets), "Sheets differ with a stale dimension record"
+        assert all(stale_sheets[name].equals(data) for name, data in all_sheets.items()), \
+            "Rows differ with a stale dimension record"
+    print(f"{sheets} sheets x {rows_per_sheet} rows: written in {write_time:.1f}s, loaded in {load_time:.1f}s")
+
+    # The counting is the same for both, only the accumulation of the per-sheet rows is timed
+    report, process_time = timed(report_core.process_sheets, 'synthetic.xlsx', all_sheets, 'CHS', 'RU', headers)
+    print(f"process_sheets(): {process_time:.1f}s in total")
+    report_rows = [report_core.make_report_row('synthetic.xlsx', sheet_name, data, 'CHS', 'RU')
+                   for sheet_name, data in all_sheets.items()]
+
+    size = 625
+    while size <= sheets:
+        old_result, old_time = timed(accumulate_with_concat, report_rows[:size], headers)
+        new_result, new_time = timed(report_core.make_report_rows_dataframe, report_rows[:size], headers)
+        assert old_result.astype(str).equals(new_result.astype(str)), "Reports differ"
+        print(f"{size:>6} sheets: pd.concat per sheet {old_time:7.3f}s, row list {new_time:7.3f}s, "
+              f"speedup x{old_time / new_time:.0f}")
+        size = sheets if size < sheets < size * 2 else size * 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Compares the per-character unicodedata.name() counter with the CJK codepoint range counter the report uses.
+
+Usage:
+    python benchmarks/bench_cjk_count.py [rows]
+"""
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import report_core  # noqa: E402
+
+sample_strings = ['攻击力提高{0}%', '<color=#FFD780FF>{1}</color>秒内', 'こんにちは、旅人！', '카드 뽑기',
+                  'Paimon', '（限时）活动奖励', '\\n第{0}层', 'ＡＢＣ', '%s 个原石', 'Battle Pass', None]
+
+
+def make_column(rows, seed=0):
+    random.seed(seed)
+    return pd.Series([random.choice(sample_strings) if random.random() < 0.3 else
+                      ''.join(random.choice(sample_strings) or '' for _ in range(4)) for _ in range(rows)])
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 400000
+    column = make_column(rows)
+    report_core.get_cjk_character_regex()  # compiling the ranges is a one-time cost, keep it out of the timings
+
+    for mode in report_core.count_options:
+        report_core.set_counting_options(count_mode=mode)
+        old_count, old_time = timed(lambda: column.apply(report_core.count_chinese_characters_by_name).sum())
+        new_count, new_time = timed(lambda: sum(map(report_core.count_chinese_characters, column.tolist())))
+        assert old_count == new_count, f"Counts differ: {old_count} != {new_count}"
+        print(f"{mode}: {rows} rows, count {new_count}, by name {old_time:.3f}s, ranges {new_time:.3f}s, "
+              f"speedup x{old_time / new_time:.1f}")
+
+
+if __name__ == '__main__':
+    main()
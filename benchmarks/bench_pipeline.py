@@ -0,0 +1,200 @@
+"""
+Times every stage of the report pipeline on synthetic workbooks (see make_workbooks.py) and saves the timings as
+JSON, so two versions of the tool can be compared on the same data.
+
+Stages:
+    load       load_sheets_as_dict() of every workbook
+    count      count_chinese_characters() of the distinct source strings of every sheet
+    regex      count_regex() of the distinct source strings of every sheet
+    sheets     process_sheets() on the loaded sheets, the fused per-sheet counting the report uses
+    fuzzy      add_fuzzy_bands() of every workbook, the trigram index and the best match of the untranslated strings
+    aggregate  combine_file_results() of the per-file results
+    write      format_and_save_to_excel() of the report
+    pipeline   process_list_of_excels() from the workbooks to the report, the way the GUI runs it
+
+Usage:
+    python benchmarks/bench_pipeline.py [generator options, see make_workbooks.py] [--workbooks FOLDER]
+        [--target RU] [--count chinese] [--strings all] [--workers 1] [--repeat 3] [--json results.json]
+        [--compare baseline.json] [--tolerance 0.2]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import openpyxl
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import report_core  # noqa: E402
+from make_workbooks import add_arguments, generate_workbooks, get_generator_options  # noqa: E402
+
+stage_names = ['load', 'count', 'regex', 'sheets', 'fuzzy', 'aggregate', 'write', 'pipeline']
+
+
+def get_commit():
+    # The benchmarked version, when running from a git checkout
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def distinct_sources(all_sheets, source_lang):
+    return [data[source_lang].drop_duplicates().tolist() for data in all_sheets.values()]
+
+
+def run_stages(file_list, source_lang, target_lang, output_path, workers):
+    """
+    Runs every stage once over the workbooks.
+
+    Returns:
+        tuple: (stage names mapped to their time in seconds, the number of rows read).
+    """
+    timings = dict.fromkeys(stage_names, 0.0)
+    rows = 0
+    headers = report_core.report_headers_variable
+    file_results = []
+    for file_path in file_list:
+        start = time.perf_counter()
+        all_sheets = report_core.load_sheets_as_dict(file_path, source_lang, target_lang)
+        timings['load'] += time.perf_counter() - start
+        rows += sum(len(data) for data in all_sheets.values())
+
+        sources = distinct_sources(all_sheets, source_lang)
+        start = time.perf_counter()
+        for strings in sources:
+            for string in strings:
+                report_core.count_chinese_characters(string)
+        timings['count'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for strings in sources:
+            for string in strings:
+                report_core.count_regex(string)
+        timings['regex'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        file_results.append(report_core.process_sheets(os.path.basename(file_path), all_sheets, source_lang,
+                                                       target_lang, headers))
+        timings['sheets'] += time.perf_counter() - start
+
+        sheets = [(data, report_core.count_source_metrics(data, source_lang)) for data in all_sheets.values()]
+        report_rows = [report_core.make_report_row(os.path.basename(file_path), sheet_name, data, source_lang,
+                                                   target_lang, source_metrics)
+                       for sheet_name, (data, source_metrics) in zip(all_sheets, sheets)]
+        start = time.perf_counter()
+        report_core.add_fuzzy_bands(report_rows, sheets, target_lang)
+        timings['fuzzy'] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    report = report_core.combine_file_results(report_core.create_report_dataframe(headers), file_results, headers)
+    timings['aggregate'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report_core.format_and_save_to_excel(report, output_path)
+    timings['write'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report_core.process_list_of_excels(report_core.create_report_dataframe(headers), file_list, source_lang,
+                                       target_lang, headers, workers)
+    timings['pipeline'] = time.perf_counter() - start
+    return timings, rows
+
+
+def compare_results(baseline, results, tolerance):
+    """
+    Prints the stage timings next to the baseline ones.
+
+    Returns:
+        list: The stages that are more than `tolerance` (a fraction) slower than in the baseline.
+    """
+    if baseline.get('config') != results['config']:
+        print("Warning: the baseline was measured with other settings, the timings are not comparable")
+    slower = []
+    print(f"{'stage':<10} {'baseline':>10} {'current':>10} {'change':>8}")
+    for stage in stage_names:
+        old = baseline['stages'].get(stage)
+        new = results['stages'][stage]
+        if not old:
+            print(f"{stage:<10} {'-':>10} {new:>9.3f}s")
+            continue
+        change = new / old - 1
+        flag = ''
+        if change > tolerance:
+            flag = '  SLOWER'
+            slower.append(stage)
+        print(f"{stage:<10} {old:>9.3f}s {new:>9.3f}s {change:>+8.0%}{flag}")
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the report pipeline on synthetic workbooks')
+    add_arguments(parser)
+    parser.add_argument('--workbooks', help='Benchmark the workbooks in this folder instead of generating them')
+    parser.add_argument('--source', default='CHS', help='Source language column (default: CHS)')
+    parser.add_argument('--target', default='RU', help='Target language column (default: RU)')
+    parser.add_argument('--count', choices=['chinese', 'words'], default='chinese',
+                        help='Count Chinese characters or words (default: chinese)')
+    parser.add_argument('--strings', choices=['all', 'unique'], default='all',
+                        help='Count all strings or unique only (default: all)')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes of the pipeline stage (default: 1)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per stage, the fastest counts (default: 3)')
+    parser.add_argument('--json', help='Save the results to this JSON file')
+    parser.add_argument('--compare', help='Compare with the results saved by an earlier run')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Slowdown of a stage that counts as a regression with --compare (default: 0.2)')
+    args = parser.parse_args()
+
+    report_core.set_counting_options({'all': 'All strings', 'unique': 'Unique only'}[args.strings],
+                                     {'chinese': 'Chinese', 'words': 'Words'}[args.count])
+    report_core.get_cjk_character_regex()  # compiling the ranges is a one-time cost, keep it out of the timings
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if args.workbooks:
+            file_list = report_core.get_xlsx_file_paths_in_folder(args.workbooks)
+            config = {'workbooks': os.path.abspath(args.workbooks)}
+        else:
+            start = time.perf_counter()
+            file_list = generate_workbooks(os.path.join(temp_dir, 'source'), **get_generator_options(args))
+            config = get_generator_options(args)
+            print(f"{len(file_list)} workbook(s) generated in {time.perf_counter() - start:.1f}s")
+        config.update({'source': args.source, 'target': args.target, 'count': args.count, 'strings': args.strings,
+                       'workers': args.workers})
+
+        best = None
+        for _ in range(args.repeat):
+            timings, rows = run_stages(file_list, args.source, args.target,
+                                       os.path.join(temp_dir, 'report.xlsx'), args.workers)
+            best = timings if best is None else {stage: min(best[stage], timings[stage]) for stage in stage_names}
+
+    results = {'version': report_core.current_version, 'commit': get_commit(), 'python': platform.python_version(),
+               'pandas': pd.__version__, 'openpyxl': openpyxl.__version__, 'config': config, 'rows': rows,
+               'stages': best,
+               'rows_per_second': {stage: rows / seconds if seconds else None for stage, seconds in best.items()}}
+
+    print(f"{rows} rows in {len(file_list)} workbook(s), fastest of {args.repeat} run(s):")
+    for stage in stage_names:
+        print(f"{stage:<10} {best[stage]:>9.3f}s {rows / best[stage] if best[stage] else 0:>12,.0f} rows/s")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as json_file:
+            json.dump(results, json_file, indent=2)
+        print(f"Results saved to {args.json}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as json_file:
+            baseline = json.load(json_file)
+        if compare_results(baseline, results, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Generates synthetic localization workbooks shaped like the yfsail exports: an ID column, the CHS source and a column
+per target language, with a configurable CJK/Latin mix, placeholder density and duplication rate.
+
+Usage:
+    python benchmarks/make_workbooks.py FOLDER [--files 10] [--sheets 20] [--rows 500] [--languages RU EN JP]
+        [--cjk-ratio 0.8] [--placeholders 0.5] [--duplication 0.3] [--translated 0.6] [--seed 0]
+"""
+import argparse
+import os
+import random
+import re
+import zipfile
+
+from openpyxl import Workbook
+
+placeholder_samples = ['{0}', '{1}', '%s', '%d', '<color=#FFD780FF>', '</color>', '\\n', '{PLAYER_NAME}',
+                       '{LAYOUT_MOBILE#Tap}{LAYOUT_PC#Click}']
+latin_words = ['Paimon', 'attack', 'bonus', 'event', 'reward', 'Battle', 'Pass', 'level', 'shield', 'HP']
+translations = {'RU': 'перевод', 'EN': 'translation', 'JP': '翻訳', 'KR': '번역', 'DE': 'Übersetzung',
+                'FR': 'traduction', 'ES': 'traducción'}
+
+
+def make_string(rng, cjk_ratio, placeholders):
+    """
+    Returns a random source string of 4-40 parts, each a CJK character with the probability cjk_ratio or else a
+    Latin word, with `placeholders` placeholders on average.
+    """
+    parts = [chr(rng.randint(0x4e00, 0x9fa5)) if rng.random() < cjk_ratio else f' {rng.choice(latin_words)} '
+             for _ in range(rng.randint(4, 40))]
+    count = int(placeholders) + (rng.random() < placeholders - int(placeholders))
+    for _ in range(count):
+        parts.insert(rng.randint(0, len(parts)), rng.choice(placeholder_samples))
+    return ''.join(parts)
+
+
+def generate_workbooks(folder, files=10, sheets=20, rows=500, languages=('RU', 'EN', 'JP'), cjk_ratio=0.8,
+                       placeholders=0.5, duplication=0.3, translated=0.6, seed=0):
+    """
+    Writes synthetic workbooks into a folder.
+
+    Args:
+        folder (str): Where to write file_0.xlsx, file_1.xlsx, ...
+        files (int): The number of workbooks.
+        sheets (int): Sheets per workbook.
+        rows (int): Rows per sheet.
+        languages (list): Target language columns next to 'CHS'.
+        cjk_ratio (float): The share of CJK characters in the source strings, the rest are Latin words.
+        placeholders (float): Placeholders per source string on average.
+        duplication (float): The share of rows repeating a source string used before, in any of the workbooks.
+        translated (float): The share of filled cells in every target column.
+        seed (int): Random seed, the same arguments and seed always give the same workbooks.
+
+    Returns:
+        list: The paths of the written workbooks.
+    """
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    used_strings = []
+    file_paths = []
+    for file_index in range(files):
+        # Write-only mode, so generating big workbooks doesn't take longer than the benchmark itself
+        wb = Workbook(write_only=True)
+        for sheet_index in range(sheets):
+            ws = wb.create_sheet(title=f'Sheet_{sheet_index}')
+            ws.append(['ID', 'CHS'] + list(languages))
+            for row_index in range(rows):
+                if used_strings and rng.random() < duplication:
+                    source = rng.choice(used_strings)
+                else:
+                    source = make_string(rng, cjk_ratio, placeholders)
+                    used_strings.append(source)
+                ws.append([f'{file_index}_{sheet_index}_{row_index}', source] +
+                          [f'{translations.get(language, language)} {row_index}' if rng.random() < translated
+                           else None for language in languages])
+        file_path = os.path.join(folder, f'file_{file_index}.xlsx')
+        wb.save(file_path)
+        file_paths.append(file_path)
+    return file_paths
+
+
+def write_stale_dimension_copy(file_path, copy_path, dimension='A1:B2'):
+    """
+    Copies a workbook with a wrong size record (<dimension ref>) in every sheet, the way some exporters write them.
+
+    Read-only openpyxl trusts this record unless the sheet's dimensions are reset, pandas always resets them.
+    """
+    with zipfile.ZipFile(file_path) as source, zipfile.ZipFile(copy_path, 'w', zipfile.ZIP_DEFLATED) as copy:
+        for item in source.infolist():
+            data = source.read(item.filename)
+            if item.filename.startswith('xl/worksheets/sheet'):
+                data = re.sub(rb'<dimension ref="[^"]*"\s*/>', b'', data)
+                data = data.replace(b'</sheetPr>', f'</sheetPr><dimension ref="{dimension}" />'.encode(), 1)
+            copy.writestr(item, data)
+
+
+def add_arguments(parser):
+    # Shared with bench_pipeline.py
+    parser.add_argument('--files', type=int, default=10, help='Workbooks (default: 10)')
+    parser.add_argument('--sheets', type=int, default=20, help='Sheets per workbook (default: 20)')
+    parser.add_argument('--rows', type=int, default=500, help='Rows per sheet (default: 500)')
+    parser.add_argument('--languages', nargs='+', default=['RU', 'EN', 'JP'],
+                        help='Target language columns (default: RU EN JP)')
+    parser.add_argument('--cjk-ratio', type=float, default=0.8,
+                        help='Share of CJK characters in the source, the rest are Latin words (default: 0.8)')
+    parser.add_argument('--placeholders', type=float, default=0.5,
+                        help='Placeholders per source string on average (default: 0.5)')
+    parser.add_argument('--duplication', type=float, default=0.3,
+                        help='Share of rows repeating an earlier source string (default: 0.3)')
+    parser.add_argument('--translated', type=float, default=0.6,
+                        help='Share of filled target cells (default: 0.6)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+
+
+def get_generator_options(args):
+    return {'files': args.files, 'sheets': args.sheets, 'rows': args.rows, 'languages': list(args.languages),
+            'cjk_ratio': args.cjk_ratio, 'placeholders': args.placeholders, 'duplication': args.duplication,
+            'translated': args.translated, 'seed': args.seed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic localization workbooks')
+    parser.add_argument('folder', help='Output folder')
+    add_arguments(parser)
+    args = parser.parse_args()
+    file_paths = generate_workbooks(args.folder, **get_generator_options(args))
+    print(f"{len(file_paths)} workbook(s) written to {args.folder}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import sys
+from datetime import datetime
+
+import report_cache
+import report_core
+import report_delta
+import report_history
+import report_sinks
+import report_watch
+import sidecar
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='main.py', description=report_core.script_name)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    report_parser = subparsers.add_parser('report', help='Generate a report without the GUI')
+    report_parser.add_argument('--folder', default=os.path.join(os.getcwd(), 'source'),
+                               help='Folder with source *.xlsx files (default: ./source)')
+    report_parser.add_argument('--subfolders', action='store_true',
+                               help='Also read the workbooks in the subfolders of the folder')
+    report_parser.add_argument('--source', default='CHS', help='Source language column (default: CHS)')
+    report_parser.add_argument('--target', required=True, nargs='+',
+                               help='Target language column, e.g. RU. Several columns (e.g. RU EN JP) make one '
+                                    'workbook with a summary sheet and a sheet per language')
+    report_parser.add_argument('--strings', choices=['all', 'unique', 'project'], default='all',
+                               help='Count all strings, unique ones per sheet, or unique ones across the whole '
+                                    'folder (default: all)')
+    report_parser.add_argument('--count', choices=['chinese', 'words'], default='chinese',
+                               help='Count source Chinese characters or words (default: chinese)')
+    report_parser.add_argument('--placeholder-pattern', action='append', dest='placeholder_patterns',
+                               help='Placeholder regex to count instead of the built-in ones, can be repeated')
+    report_parser.add_argument('--placeholder-file',
+                               help='File with one placeholder regex per line, used instead of the built-in ones')
+    report_parser.add_argument('--workers', type=int, default=1,
+                               help='Worker processes for parallel processing, 0 uses all CPU cores (default: 1)')
+    report_parser.add_argument('--cache', nargs='?', const=report_cache.default_cache_path,
+                               help='Reuse the results of unchanged files from this cache file '
+                                    '(default when given without a path: ./cache/report_cache.sqlite)')
+    report_parser.add_argument('--rebuild-cache', action='store_true',
+                               help='Drop the cached results and process every file again')
+    report_parser.add_argument('--cache-size', type=int, default=5000,
+                               help='Maximum number of cached file results (default: 5000)')
+    report_parser.add_argument('--hash-content', action='store_true',
+                               help='Also compare file contents, not just size and modification time')
+    report_parser.add_argument('--sidecar', nargs='?', const=sidecar.default_sidecar_folder,
+                               help='Read columns from fast sidecar files in this folder, extracting them on first '
+                                    'use (default when given without a path: ./cache/sidecars)')
+    report_parser.add_argument('--streaming', action='store_true',
+                               help='Count rows while reading them, for workbooks too big for memory. '
+                                    'Prints the peak memory use')
+    report_parser.add_argument('--fuzzy', action='store_true',
+                               help='Split the untranslated volume into fuzzy match bands (100%%, 95-99%%, 85-94%%, '
+                                    '75-84%%, no match) against the translated strings of the same file')
+    report_parser.add_argument('--timing', action='store_true',
+                               help='Print the time and rows of every stage of every file, with the peak memory '
+                                    'of the process so far')
+    report_parser.add_argument('--timing-sheet', action='store_true',
+                               help="Add the timings to the report as a 'Timing' sheet")
+    report_parser.add_argument('--timing-json', help='Save the timings to this JSON file')
+    report_parser.add_argument('--profile',
+                               help='Profile the run with cProfile, save the stats to this file and print the top '
+                                    'functions. Covers the main process only, use it with --workers 1')
+    report_parser.add_argument('--memo-size', type=int, default=100000,
+                               help='Strings whose counts are remembered across files and sheets, 0 switches the '
+                                    'memo off (default: 100000)')
+    report_parser.add_argument('--memo-file',
+                               help='Seed the string count memo from this file (also in worker processes) and '
+                                    'save it there after the run')
+    report_parser.add_argument('--memo-stats', action='store_true',
+                               help="Print the string count memo's hit ratio")
+    report_parser.add_argument('--output', help='Report path (default: ./reports/report_<timestamp>.xlsx)')
+    report_parser.add_argument('--no-xlsx', action='store_true', help='Skip the formatted report workbook')
+    report_parser.add_argument('--export', action='append', dest='exports', default=[],
+                               help='Also write the plain report table (numbers, no Total row) to this file, as '
+                                    f"{', '.join(ext.lstrip('.') for ext in report_sinks.output_sinks)} by its "
+                                    'extension. Can be repeated')
+    report_parser.add_argument('--detail',
+                               help='Also write every untranslated row (file, sheet, row, source text, characters and '
+                                    'placeholders) to this .csv or .parquet file, split into the six batches of the '
+                                    "'Batch' columns")
+    report_parser.add_argument('--detail-placeholders', type=int,
+                               help='With --detail, also write the translated rows with at least this many '
+                                    'placeholders')
+    report_parser.add_argument('--summary', action='store_true', help='Print the report totals')
+    report_parser.add_argument('--history', nargs='?', const=report_history.default_history_path,
+                               help='Append the sheets of the report to this history store, for `history` queries '
+                                    '(default when given without a path: ./cache/report_history.sqlite)')
+    report_parser.set_defaults(func=run_report)
+
+    extract_parser = subparsers.add_parser('extract', help='Convert workbooks into sidecar files for later reports')
+    extract_parser.add_argument('--folder', default=os.path.join(os.getcwd(), 'source'),
+                                help='Folder with source *.xlsx files (default: ./source)')
+    extract_parser.add_argument('--subfolders', action='store_true',
+                                help='Also read the workbooks in the subfolders of the folder')
+    extract_parser.add_argument('--sidecar', default=sidecar.default_sidecar_folder,
+                                help='Folder for the sidecar files (default: ./cache/sidecars)')
+    extract_parser.add_argument('--force', action='store_true', help='Extract files that are already up to date')
+    extract_parser.set_defaults(func=run_extract)
+
+    delta_parser = subparsers.add_parser('delta', help='Report what changed since the previous source drop')
+    delta_parser.add_argument('--folder', default=os.path.join(os.getcwd(), 'source'),
+                              help='Folder with the current source *.xlsx files (default: ./source)')
+    delta_parser.add_argument('--subfolders', action='store_true',
+                              help='Also read the workbooks in the subfolders of the folder')
+    delta_parser.add_argument('--previous', help='Folder with the previous source drop to compare with')
+    delta_parser.add_argument('--snapshot', nargs='?', const=report_delta.default_snapshot_path,
+                              help='Compare with the snapshot of the previous run instead, and save the current '
+                                   'folder to it (default when given without a path: ./cache/snapshot.sqlite)')
+    delta_parser.add_argument('--source', default='CHS', help='Source language column (default: CHS)')
+    delta_parser.add_argument('--target', required=True, help='Target language column, e.g. RU')
+    delta_parser.add_argument('--count', choices=['chinese', 'words'], default='chinese',
+                              help='Count source Chinese characters or words (default: chinese)')
+    delta_parser.add_argument('--key-column', default=report_delta.default_key_column,
+                              help='Column that identifies the rows, sheets without it are compared row by row '
+                                   '(default: ID)')
+    delta_parser.add_argument('--output', help='Report path (default: ./reports/delta_<timestamp>.xlsx)')
+    delta_parser.set_defaults(func=run_delta)
+
+    watch_parser = subparsers.add_parser('watch', help='Keep a report up to date while the source folder changes')
+    watch_parser.add_argument('--folder', default=os.path.join(os.getcwd(), 'source'),
+                              help='Folder with source *.xlsx files (default: ./source)')
+    watch_parser.add_argument('--subfolders', action='store_true',
+                              help='Also read the workbooks in the subfolders of the folder')
+    watch_parser.add_argument('--source', default='CHS', help='Source language column (default: CHS)')
+    watch_parser.add_argument('--target', required=True, help='Target language column, e.g. RU')
+    watch_parser.add_argument('--strings', choices=['all', 'unique', 'project'], default='all',
+                              help='Count all strings, unique ones per sheet, or unique ones across the whole '
+                                   'folder (default: all)')
+    watch_parser.add_argument('--count', choices=['chinese', 'words'], default='chinese',
+                              help='Count source Chinese characters or words (default: chinese)')
+    watch_parser.add_argument('--interval', type=float, default=2.0,
+                              help='Seconds between two scans of the folder (default: 2)')
+    watch_parser.add_argument('--debounce', type=float, default=5.0,
+                              help='Seconds a changed file has to stay unchanged before it is processed (default: 5)')
+    watch_parser.add_argument('--workers', type=int, default=1,
+                              help='Worker processes for the changed files, 0 uses all CPU cores (default: 1)')
+    watch_parser.add_argument('--cache', nargs='?', const=report_cache.default_cache_path,
+                              help='Reuse the results of unchanged files from this cache file after a restart '
+                                   '(default when given without a path: ./cache/report_cache.sqlite)')
+    watch_parser.add_argument('--output', default=os.path.join(os.getcwd(), 'reports', 'report_watch.xlsx'),
+                              help='Report to keep up to date (default: ./reports/report_watch.xlsx)')
+    watch_parser.set_defaults(func=run_watch)
+
+    history_parser = subparsers.add_parser('history', help='Show the completeness of earlier reports over time')
+    history_parser.add_argument('--history', default=report_history.default_history_path,
+                                help='History store (default: ./cache/report_history.sqlite)')
+    history_parser.add_argument('--folder', default=os.path.join(os.getcwd(), 'source'),
+                                help='Only the reports of this source folder (default: ./source)')
+    history_parser.add_argument('--source', default='CHS', help='Source language column (default: CHS)')
+    history_parser.add_argument('--target', help='Target language column (default: all of them)')
+    history_parser.add_argument('--strings', choices=['all', 'unique', 'project'], default='all',
+                                help='Counting option of the reports to show (default: all)')
+    history_parser.add_argument('--count', choices=['chinese', 'words'], default='chinese',
+                                help='Counting option of the reports to show (default: chinese)')
+    history_parser.add_argument('--by-file', action='store_true', help='A line per file instead of per report')
+    history_parser.add_argument('--file', help='Only this file, e.g. Quest.xlsx')
+    history_parser.add_argument('--since', help='Only reports from this date on, e.g. 2023-05-01')
+    history_parser.add_argument('--json', action='store_true', help='Print JSON instead of a table')
+    history_parser.set_defaults(func=run_history)
+
+    return parser
+
+
+strings_choices = {'all': 'All strings', 'unique': 'Unique only', 'project': 'Unique across project'}
+count_choices = {'chinese': 'Chinese', 'words': 'Words'}
+
+
+def run_report(args):
+    output_path = args.output
+    if args.no_xlsx:
+        output_path = None
+    elif not output_path:
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        output_path = os.path.join(os.getcwd(), 'reports', f'report_{timestamp}.xlsx')
+    placeholder_patterns = list(args.placeholder_patterns or [])
+    if args.placeholder_file:
+        placeholder_patterns += report_core.load_placeholder_patterns(args.placeholder_file)
+    cache = None
+    if args.cache or args.rebuild_cache:
+        cache = report_cache.ReportCache(args.cache or report_cache.default_cache_path, args.cache_size,
+                                         args.hash_content)
+        if args.rebuild_cache:
+            cache.invalidate()
+    errors = []
+    profiler = cProfile.Profile() if args.profile else None
+    try:
+        target = args.target[0] if len(args.target) == 1 else args.target
+        if profiler is not None:
+            profiler.enable()
+        report = report_core.generate_report(args.folder, args.source, target, strings_choices[args.strings],
+                                             count_choices[args.count], output_path, placeholder_patterns,
+                                             args.workers, errors, cache, args.sidecar, args.streaming,
+                                             args.memo_size, args.memo_file, args.memo_stats, args.fuzzy,
+                                             timing=args.timing, timing_sheet_enabled=args.timing_sheet,
+                                             timing_json_path=args.timing_json, export_paths=args.exports,
+                                             history_path=args.history, subfolders=args.subfolders,
+                                             detail_file=args.detail, detail_placeholders=args.detail_placeholders)
+    except ValueError as e:
+        print(e)
+        return 1
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"Profile saved to {args.profile}, the slowest functions:")
+            pstats.Stats(profiler, stream=sys.stdout).sort_stats('cumulative').print_stats(25)
+        if cache is not None:
+            cache.close()
+    if args.summary:
+        report_sinks.print_summary(report)
+    if output_path:
+        print(f"Report has been generated. You can find it at: {output_path}")
+    if errors:
+        print(f"{len(errors)} file(s) could not be processed and are missing from the report:")
+        for file_path, message in errors:
+            print(f"  {file_path}: {message}")
+        return 1
+    return 0
+
+
+def run_delta(args):
+    report_core.scan_subfolders = args.subfolders
+    if not args.previous and not args.snapshot:
+        print("Give the previous drop with --previous FOLDER or --snapshot [PATH]")
+        return 2
+    output_path = args.output
+    if not output_path:
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        output_path = os.path.join(os.getcwd(), 'reports', f'delta_{timestamp}.xlsx')
+    try:
+        delta = report_delta.generate_delta_report(args.folder, args.source, args.target, args.previous,
+                                                   args.snapshot, output_path, args.key_column,
+                                                   count_choices[args.count])
+    except ValueError as e:
+        print(f"{e}. Use another --snapshot path or take a new baseline")
+        return 1
+    if delta is None:
+        print(f"No previous snapshot yet, saved the current folder to {args.snapshot} as the baseline")
+    else:
+        print(f"Delta report has been generated. You can find it at: {output_path}")
+    return 0
+
+
+def run_watch(args):
+    report_core.scan_subfolders = args.subfolders
+    report_core.set_counting_options(strings_choices[args.strings], count_choices[args.count])
+    cache = report_cache.ReportCache(args.cache) if args.cache else None
+    try:
+        report_watch.watch_folder(args.folder, args.source, args.target, args.output, args.interval, args.debounce,
+                                  args.workers, cache)
+    finally:
+        if cache is not None:
+            cache.close()
+    return 0
+
+
+def run_history(args):
+    if not os.path.exists(args.history):
+        print(f"No history at {args.history} yet, generate reports with --history first")
+        return 1
+    # Runs are kept apart by these two options only, see report_history.history_option_names
+    options = {'unique_or_all': strings_choices[args.strings], 'count_mode': count_choices[args.count]}
+    history = report_history.ReportHistory(args.history)
+    try:
+        points = history.completeness_over_time(args.source, args.target, options,
+                                                args.by_file or args.file is not None, args.file, args.since,
+                                                args.folder)
+    finally:
+        history.close()
+    points = report_history.add_burn_down(points)
+    if args.json:
+        print(json.dumps(points, ensure_ascii=False, indent=2))
+    elif points:
+        print(report_history.format_history(points))
+    else:
+        print("No reports match these options")
+    return 0
+
+
+def run_extract(args):
+    report_core.scan_subfolders = args.subfolders
+    file_list = report_core.get_xlsx_file_paths_in_folder(args.folder)
+    extracted = sidecar.extract_folder(file_list, args.sidecar, args.force)
+    print(f"{extracted} of {len(file_list)} file(s) extracted to {args.sidecar}")
+    return 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,375 @@
+import os
+import queue
+import sys
+import threading
+import time
+import tkinter as tk
+import webbrowser
+from datetime import datetime
+from tkinter import filedialog
+from tkinter import messagebox
+from tkinter import ttk
+
+import report_core
+import report_history
+from report_core import (current_version, script_name, language_codes, report_headers_variable,
+                         get_xlsx_file_paths_in_folder, create_report_dataframe, read_and_save)
+
+now = datetime.now()
+timestamp = now.strftime("%Y-%m-%d_%H-%M-%S")
+
+# Variables that should be changed
+folder_location = os.path.join(os.getcwd(), 'source')
+
+source_lang_codes_all = language_codes
+# report_save_path = r'c:\2\report.xlsx'
+report_save_path = os.path.join(os.getcwd(), 'reports', 'report_{}.xlsx'.format(timestamp))
+
+output_filepath = ''
+
+
+# The report runs in a background thread, which talks to the window only through this queue:
+# ('text', text), ('progress', files done, number of files, file path, files per second),
+# ('done', report path, errors), ('cancelled', message) and ('error', message)
+gui_queue = queue.Queue()
+cancel_event = threading.Event()
+report_thread = None
+
+
+def for_button():
+    global report_thread
+    if report_thread is not None and report_thread.is_alive():
+        return
+    cancel_event.clear()
+    set_running(True)
+    progress_bar.config(value=0, maximum=1)
+    progress_label.config(text="Looking for files...")
+    report_thread = threading.Thread(target=generate_in_background,
+                                     args=(folder_location, source_lang_code.get(), target_lang_code.get(),
+                                           report_save_path),
+                                     daemon=True)
+    report_thread.start()
+    print("Button clicked")
+
+
+def generate_in_background(folder, source, target, save_path):
+    errors = []
+    started = time.monotonic()
+
+    def progress(done, total, file_path):
+        gui_queue.put(('progress', done, total, file_path, done / max(time.monotonic() - started, 1e-6)))
+
+    try:
+        # Scanned here rather than at startup, so the window doesn't wait for a slow network drive
+        files = get_xlsx_file_paths_in_folder(folder)
+        report_core.source_folder = folder
+        gui_queue.put(('progress', 0, len(files), None, 0.0))
+        report = read_and_save(create_report_dataframe(report_headers_variable), files, source, target,
+                               report_headers_variable, save_path, errors=errors, progress=progress,
+                               cancel_event=cancel_event)
+        # Every report also goes to the history, for the completeness trends of `main.py history`
+        report_core.record_history(report, folder, source, target, report_history.default_history_path)
+        gui_queue.put(('done', save_path, errors))
+    except report_core.ReportCancelled as e:
+        gui_queue.put(('cancelled', str(e)))
+    except Exception as e:
+        gui_queue.put(('error', str(e)))
+
+
+def cancel_report():
+    # The file that is being processed is finished first
+    cancel_event.set()
+    cancel_button.config(state='disabled')
+    print("Cancelling after the current file...")
+
+
+def set_running(running):
+    # The options are read by the report thread, so they can't change while it runs
+    state = 'disabled' if running else 'normal'
+    for widget in (process_button, browse_button, save_report_button, dropdown, dropdown2, timing_checkbutton,
+                   subfolders_checkbutton):
+        widget.config(state=state)
+    for combobox in (source_lang_combobox, target_lang_combobox):
+        combobox.config(state='disabled' if running else 'readonly')
+    cancel_button.config(state='normal' if running else 'disabled')
+
+
+def show_result(message):
+    kind = message[0]
+    set_running(False)
+    if kind == 'done':
+        _, save_path, errors = message
+        # Show popup window with message "Process complete"
+        text = "Report has been generated. You can find it at: " + str(save_path)
+        if errors:
+            text += "\n\nThese files could not be processed:\n" + "\n".join(
+                f"{os.path.basename(file_path)}: {error}" for file_path, error in errors)
+            messagebox.showwarning("Process complete", text)
+        else:
+            messagebox.showinfo("Process complete", text)
+    elif kind == 'cancelled':
+        progress_label.config(text=message[1])
+        messagebox.showinfo("Cancelled", message[1] + ", no report was saved.")
+    else:
+        # Show popup window with error message
+        messagebox.showerror("Error", message[1])
+
+
+def poll_queue():
+    # Runs on the Tk thread, the only one allowed to touch the widgets
+    try:
+        while True:
+            message = gui_queue.get_nowait()
+            if message[0] == 'text':
+                output_text.configure(state='normal')
+                output_text.insert(tk.END, message[1])
+                output_text.see(tk.END)
+                output_text.configure(state='disabled')
+            elif message[0] == 'progress':
+                _, done, total, file_path, files_per_second = message
+                progress_bar.config(value=done, maximum=max(total, 1))
+                progress_label.config(text=f"{done}/{total} files, {files_per_second:.1f} files/s")
+            else:
+                show_result(message)
+    except queue.Empty:
+        pass
+    window.after(100, poll_queue)
+
+
+def browse_folder():
+    global folder_location
+    folder_location = filedialog.askdirectory()
+    folder_path_var.set(folder_location)
+    print(folder_location)
+
+
+def save_report():
+    global report_save_path
+    appendix = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    report_save_path = filedialog.asksaveasfilename(defaultextension='.xlsx', initialfile=f"report_{appendix}")
+    report_save_path_label.config(text=report_save_path)
+
+
+# Create a new window object
+window = tk.Tk()
+window_name = script_name
+# Set the window title
+window.title(window_name)
+
+# Set the window size
+window.geometry("620x400")
+
+# Create a frame to hold the browse button and file path
+frame = tk.Frame(window)
+
+# Info text
+info_text = tk.Label(window, text="Select a folder with source *.xlsx files")
+info_text.grid(row=0, column=0, sticky='w', padx=10, pady=0)
+
+
+def on_subfolders_change():
+    report_core.scan_subfolders = subfolders_var.get()
+
+
+subfolders_var = tk.BooleanVar(window, value=False)
+subfolders_checkbutton = tk.Checkbutton(window, text="Include subfolders", variable=subfolders_var,
+                                        command=on_subfolders_change)
+subfolders_checkbutton.grid(row=0, column=0, sticky='w', padx=300, pady=0)
+
+# Create a frame to hold the browse button and file path
+frame.grid(row=1, column=0, padx=10, pady=10, sticky='w')
+
+# Create a button to browse for a folder
+folder_path_var = tk.StringVar()
+browse_button = ttk.Button(frame, text="Browse folder", command=browse_folder)
+browse_button.grid(row=1, column=0, padx=0, pady=5, sticky='w')
+
+# Create a text field to display the folder path
+
+folder_path_var.set(folder_location)
+folder_path_entry = tk.Entry(frame, textvariable=folder_path_var, width=80)
+folder_path_entry.grid(row=1, column=0, padx=120, pady=5, sticky='w')
+
+# Elements for saving report
+save_report_button = ttk.Button(window, text="Save report to...", command=save_report)
+save_report_button.grid(row=2, column=0, padx=10, pady=10, sticky='w')
+report_save_path_label = tk.Label(window, text=report_save_path)
+report_save_path_label.grid(row=2, column=0, padx=130, pady=10, sticky='w')
+
+# Elements for language codes
+lang_codes_label1 = tk.Label(window, text="Source Language Code:")
+lang_codes_label1.grid(row=3, column=0, sticky='w', padx=10, pady=10)
+source_lang_code = tk.StringVar()
+source_lang_combobox = ttk.Combobox(window, textvariable=source_lang_code, values=source_lang_codes_all, width=5,
+                                    state='readonly')
+source_lang_combobox.current(source_lang_codes_all.index('CHS'))
+source_lang_combobox.grid(row=3, column=0, sticky='w', padx=150, pady=10)
+
+
+
+def on_timing_change():
+    # Timings go to the log and to a 'Timing' sheet of the report
+    report_core.timing_enabled = report_core.timing_sheet = timing_var.get()
+
+
+timing_var = tk.BooleanVar(window, value=False)
+timing_checkbutton = tk.Checkbutton(window, text="Log stage timings", variable=timing_var, command=on_timing_change)
+timing_checkbutton.grid(row=3, column=0, sticky='w', padx=250, pady=10)
+
+lang_codes_label2 = tk.Label(window, text="Target Language:")
+lang_codes_label2.grid(row=6, column=0, sticky='w', padx=10, pady=10)
+
+target_lang_code = tk.StringVar()
+target_lang_combobox = ttk.Combobox(window, textvariable=target_lang_code, values=source_lang_codes_all, width=5,
+                                    state='readonly')
+target_lang_combobox.current(source_lang_codes_all.index('RU'))
+target_lang_combobox.grid(row=6, column=0, sticky='w', padx=150, pady=10)
+
+# Button to process files
+process_button = ttk.Button(window, text="Generate report", command=for_button)
+process_button.grid(row=9, column=0, padx=10, pady=10, sticky='w')
+cancel_button = ttk.Button(window, text="Cancel", command=cancel_report, state='disabled')
+cancel_button.grid(row=9, column=0, padx=120, pady=10, sticky='w')
+
+# Progress of the running report
+progress_bar = ttk.Progressbar(window, orient='horizontal', length=200, mode='determinate')
+progress_bar.grid(row=9, column=0, padx=210, pady=10, sticky='w')
+progress_label = tk.Label(window, text="")
+progress_label.grid(row=9, column=0, padx=420, pady=10, sticky='w')
+
+
+# unique change
+
+def on_unique_or_all_change(*args):
+    report_core.set_counting_options(unique_or_all=unique_or_all_var.get())
+    print("selection_unique_or_all:", report_core.selection_unique_or_all)
+
+
+# Create a StringVar to hold the selected option
+unique_or_all_var = tk.StringVar(window)
+unique_or_all_var.trace('w', on_unique_or_all_change)
+
+# Set the default value
+unique_or_all_var.set("All strings")
+
+# Create the dropdown menu
+
+# Create a custom style for the dropdown menu
+options = report_core.unique_or_all_options
+dropdown2 = tk.OptionMenu(window, unique_or_all_var, *options)
+source_count_label2 = tk.Label(window, text="Count all strings or unique only?")
+source_count_label2.grid(row=8, column=0, sticky='w', padx=10, pady=10)
+dropdown2.grid(row=8, column=0, padx=200, pady=5, sticky='w')
+
+
+# count source change
+
+def on_option_change(*args):
+    report_core.set_counting_options(count_mode=var.get())
+    print("cjk_or_words_count:", report_core.cjk_or_words_count)
+
+
+# Create a StringVar to hold the selected option
+var = tk.StringVar(window)
+var.trace('w', on_option_change)
+
+var.set("Chinese")
+
+# Create a custom style for the dropdown menu
+
+
+options = report_core.count_options
+dropdown = tk.OptionMenu(window, var, *options)
+source_count_label = tk.Label(window, text="Count source Chinese or Words?")
+source_count_label.grid(row=7, column=0, sticky='w', padx=10, pady=10)
+dropdown.grid(row=7, column=0, padx=200, pady=10, sticky='w')
+
+
+# Text in the bottom
+def open_url(url):
+    webbrowser.open(url)
+
+
+about_label = tk.Label(window, text="github.com/wtigga\nVladimir Zhdanov", fg="blue", cursor="hand2", justify="left")
+about_text = tk.Label(window, text=current_version)
+about_text.grid(row=10, column=0, sticky='w', padx=10, pady=0)
+about_label.bind("<Button-1>",
+                 lambda event: open_url("https://github.com/wtigga/TranslationSourceExcelFilesReportGeneratorGI"))
+about_label.grid(row=11, column=0, sticky='w', padx=10, pady=0)
+
+
+# console output
+class TextRedirector:
+    # Safe to write from any thread, poll_queue() shows the text in the widget
+    def __init__(self, text_queue):
+        self.text_queue = text_queue
+
+    def write(self, text):
+        self.text_queue.put(('text', text))
+
+    def flush(self):
+        pass
+
+
+output_text = tk.Text(window, wrap='word', height=10, state='disabled')
+output_text.grid(row=12, column=0, sticky='nsew')
+
+sys.stdout = TextRedirector(gui_queue)
+window.after(100, poll_queue)
+# pandas and openpyxl are imported while the window waits for input, so the first report doesn't wait for them
+window.after_idle(lambda: threading.Thread(target=report_core.preload_modules, daemon=True).start())
+
+
+# tooltips
+class ToolTip:
+    def __init__(self, widget, text):
+        self.widget = widget
+        self.text = text
+        self.tip_window = None
+
+        self.widget.bind("<Enter>", self.on_enter)
+        self.widget.bind("<Leave>", self.on_leave)
+
+    def on_enter(self, event=None):
+        if self.tip_window:
+            self.tip_window.destroy()
+
+        x, y, _, _ = self.widget.bbox("insert")
+        x += self.widget.winfo_rootx() + 25
+        y += self.widget.winfo_rooty() + 25
+
+        self.tip_window = tk.Toplevel(self.widget)
+        self.tip_window.wm_overrideredirect(True)
+        self.tip_window.wm_geometry(f"+{x}+{y}")
+
+        label = tk.Label(self.tip_window, text=self.text, background="#ffffe0", relief="solid", borderwidth=1)
+        label.pack()
+
+    def on_leave(self, event=None):
+        if self.tip_window:
+            self.tip_window.destroy()
+            self.tip_window = None
+
+
+source_count_label_tooltip_text = 'Chinese is suitable when source is in Chinese or Japanese. It will count only ' \
+                                  'those characters.\nWords suitable for other languages, like English, it will count' \
+                                  ' words (delimited by a space).'
+source_count_label_tooltip = ToolTip(source_count_label, source_count_label_tooltip_text)
+
+source_count_label2_tooltip_text = 'All strings will count as is. Unique only will first drop the 100% duplicates in ' \
+                                   'source in each sheet (ID).\nMight be a slight inconsistency in completeness.\n' \
+                                   'Unique across project counts each string once for the whole folder, in the ' \
+                                   'file where it first appears,\nand shows the new and repeated volume per sheet.'
+source_count_label2_tooltip = ToolTip(source_count_label2, source_count_label2_tooltip_text)
+
+lang_codes_label1_tooltip_text = 'Case sensitive - "EN" and "en" are not the same.'
+lang_codes_label1_tooltip = ToolTip(lang_codes_label1, lang_codes_label1_tooltip_text)
+lang_codes_label2_tooltip = ToolTip(lang_codes_label2, lang_codes_label1_tooltip_text)
+
+info_text_tooltip_text = 'The folder must only contain source files, and nothing else.'
+info_text_tooltip = ToolTip(info_text, info_text_tooltip_text)
+browse_button_tooltip = ToolTip(browse_button, info_text_tooltip_text)
+
+
+'''While the logic and architecture are products of the author's thinking capabilities,
+lots of functions in the code were written with the help of OpenAi's ChatGPT 3.5 and ChatGPT 4.'''
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+
+default_cache_path = os.path.join(os.getcwd(), 'cache', 'report_cache.sqlite')
+
+
+class ReportCache:
+    """
+    Persistent cache of process_excel_file() results, one entry per file and set of options.
+
+    Entries are keyed by the file's path, size and modification time (optionally its content hash), the
+    language pair and the counting options, so a changed file or option never gets a stale result.
+    The least recently used entries are evicted once there are more than max_entries of them.
+    """
+
+    def __init__(self, path=default_cache_path, max_entries=5000, hash_content=False):
+        self.path = path
+        self.max_entries = max_entries
+        self.hash_content = hash_content
+        self.hits = 0
+        self.misses = 0
+        cache_dir = os.path.dirname(path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS results ('
+                                'key TEXT PRIMARY KEY, file_path TEXT, options TEXT, result BLOB, last_used REAL)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS results_file ON results (file_path, options)')
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def file_key(self, excel_file, source_lang, target_lang, options):
+        """
+        Returns the cache key of a file's results, and the path and options it was built from.
+
+        Args:
+            excel_file (str): The path of the Excel file.
+            source_lang (str): The source language column.
+            target_lang (str): The target language column.
+            options (dict): The counting options, as returned by report_core.get_processing_options().
+
+        Returns:
+            tuple: (key, absolute file path, options string).
+        """
+        file_path = os.path.abspath(excel_file)
+        stat = os.stat(file_path)
+        fingerprint = [stat.st_size, stat.st_mtime_ns]
+        if self.hash_content:
+            fingerprint.append(hash_file(file_path))
+        options_string = json.dumps([source_lang, target_lang, options], sort_keys=True)
+        key = hashlib.sha256(json.dumps([file_path, fingerprint, options_string]).encode('utf-8')).hexdigest()
+        return key, file_path, options_string
+
+    def get(self, excel_file, source_lang, target_lang, options):
+        key, _, _ = self.file_key(excel_file, source_lang, target_lang, options)
+        row = self.connection.execute('SELECT result FROM results WHERE key = ?', (key,)).fetchone()
+        if row is not None:
+            try:
+                result = pickle.loads(row[0])
+            except Exception:
+                # Written by an incompatible pandas version, treat it as a miss
+                result = None
+            if result is not None:
+                self.hits += 1
+                self.connection.execute('UPDATE results SET last_used = ? WHERE key = ?', (time.time(), key))
+                self.connection.commit()
+                return result
+        self.misses += 1
+        return None
+
+    def put(self, excel_file, source_lang, target_lang, options, result):
+        key, file_path, options_string = self.file_key(excel_file, source_lang, target_lang, options)
+        # An older version of the same file with the same options can never be hit again
+        self.connection.execute('DELETE FROM results WHERE file_path = ? AND options = ?', (file_path, options_string))
+        self.connection.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)',
+                                (key, file_path, options_string, pickle.dumps(result), time.time()))
+        self.evict()
+        self.connection.commit()
+
+    def evict(self):
+        self.connection.execute('DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_used DESC '
+                                'LIMIT -1 OFFSET ?)', (self.max_entries,))
+
+    def invalidate(self, excel_file=None):
+        # Drops the entries of one file, or of every file if none is given
+        if excel_file is None:
+            self.connection.execute('DELETE FROM results')
+        else:
+            self.connection.execute('DELETE FROM results WHERE file_path = ?', (os.path.abspath(excel_file),))
+        self.connection.commit()
+
+
+def hash_file(file_path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
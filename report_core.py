@@ -0,0 +1,1954 @@
+import hashlib
+import heapq
+import importlib
+import json
+import os
+import pickle
+import re
+import sys
+import time
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+from operator import itemgetter
+
+import unicodedata
+
+
+class LazyModule:
+    """
+    Stands in for a heavy module until it's first used, so the window and the command line start without waiting
+    for pandas and numpy to import.
+
+    The first attribute lookup imports the module and puts it in place of the stand-in, so later uses cost nothing.
+    openpyxl is imported by the functions that read and write workbooks.
+
+    Args:
+        name (str): The module to import.
+        namespace (dict): The globals() of the importing module.
+        alias (str): The name of the stand-in in that namespace.
+        on_load (callable): Called with the module after it's imported.
+    """
+
+    def __init__(self, name, namespace, alias, on_load=None):
+        self.name = name
+        self.namespace = namespace
+        self.alias = alias
+        self.on_load = on_load
+
+    def load(self):
+        # import_module() holds the import lock, so threads loading the same module at once get the same object
+        module = importlib.import_module(self.name)
+        if self.namespace.get(self.alias) is self:
+            self.namespace[self.alias] = module
+            if self.on_load is not None:
+                self.on_load(module)
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self.load(), attribute)
+
+
+def set_display_options(pandas):
+    # Printed DataFrames show every row and column
+    pandas.set_option('display.max_rows', None)
+    pandas.set_option('display.max_columns', None)
+    pandas.set_option('display.width', None)
+    pandas.set_option('display.expand_frame_repr', False)
+
+
+np = LazyModule('numpy', globals(), 'np')
+pd = LazyModule('pandas', globals(), 'pd', on_load=set_display_options)
+
+
+def preload_modules():
+    # Imports the heavy modules ahead of the first report, e.g. in a background thread while the window is idle
+    import openpyxl  # noqa: F401
+
+    for module in (np, pd):
+        if isinstance(module, LazyModule):
+            module.load()
+
+
+current_version = '0.30 (2023-04-28)'
+script_name = 'Translation Report Tool GI v.' + current_version
+
+# Counting options, switched by the GUI dropdowns or passed to generate_report()
+cjk_or_words_count = 'Chinese'
+selection_unique_or_all = 'All strings'
+
+# Folder with the columnar sidecar files of the workbooks (see sidecar.py), None reads the workbooks directly
+sidecar_folder = None
+
+# Count rows as they are read instead of loading whole sheets, see process_excel_file_streaming()
+streaming_mode = False
+
+# Per-string count memo shared by all the files of a run, see StringCountMemo. 0 switches it off
+memo_size = 100000
+# File the memo is seeded from (also in worker processes) and saved to, None keeps it in memory only
+memo_file = None
+# Print the memo's hit ratio at the end of a run
+memo_stats = False
+
+# Also read the workbooks in the subfolders of the source folder, see get_xlsx_file_paths_in_folder()
+scan_subfolders = False
+# The folder of the run's workbooks. With scan_subfolders, the reports name a workbook by its path relative to it,
+# see get_file_name()
+source_folder = None
+
+# Write every untranslated row to this .csv or .parquet file, see report_detail.py. None switches it off. With
+# detail_placeholder_minimum, translated rows with at least that many placeholders are written too
+detail_path = None
+detail_placeholder_minimum = None
+# The DetailPartWriter of the workbook being processed, set by process_one_file()
+detail_writer = None
+
+# Split the untranslated volume into translation memory style fuzzy match bands, see add_fuzzy_bands()
+fuzzy_bands = False
+
+# Record the wall time and rows of every stage, with the peak memory of the process so far, see record_stage(). The
+# timings are printed after the run, and can also be saved as a 'Timing' sheet of the report or as a JSON file
+timing_enabled = False
+timing_sheet = False
+timing_json = None
+stage_timings = []
+timing_started = None
+string_count_seconds = {'characters': 0.0, 'placeholders': 0.0}
+string_counts = None
+
+count_options = ["Chinese", "Words"]
+unique_or_all_options = ["All strings", "Unique only", "Unique across project"]
+
+
+# File handling
+
+regex_pattern = r"(<.+?>)|(%[sdmyY])|({\d})|\((\+{\d})\)|({[A-Z]})|(\[[^\[]+\])|(\(\+\[[^\]]+\]\)%?)|(\d+\.?\d*%)|(" \
+                r"\\n)|(\$\[[\w]+\])|(\{[A-Z_#0-9]+\})|(\bhttps?://\S+)|(\${\w+})|(&lt;t class=\"t_lc\"&gt;)|(" \
+                r"&lt;/t&gt;)|@"
+
+# Compiled once; set_placeholder_patterns() swaps it for project-specific patterns
+placeholder_regex = re.compile(regex_pattern)
+
+def iter_xlsx_entries(folder_path, recursive=False):
+    """
+    Yields the os.DirEntry of every '.xlsx' file of a folder in name order, then those of its subfolders.
+
+    The entries come from a single directory listing per folder, which also tells files from folders, so big
+    folders on network drives aren't checked file by file. Links to folders aren't followed. Directory order
+    depends on the file system, sorting by name (ignoring case, like Windows does) keeps the report rows and the
+    "Unique across project" attribution the same on every machine.
+
+    Args:
+        folder_path (str): The path of the folder to search.
+        recursive (bool): Also search the subfolders, and theirs. Subfolders that can't be read are reported and
+            skipped.
+
+    Raises:
+        OSError: If folder_path itself can't be read.
+    """
+    files = []
+    subfolders = []
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if entry.name.lower().endswith('.xlsx') and entry.is_file():
+                files.append(entry)
+            elif recursive and entry.is_dir(follow_symlinks=False):
+                subfolders.append(entry)
+
+    def by_name(entry):
+        return entry.name.lower(), entry.name
+
+    yield from sorted(files, key=by_name)
+    for subfolder in sorted(subfolders, key=by_name):
+        # A subfolder that can't be read (no permission, a network share that dropped) is skipped, not the whole scan.
+        # It's listed in full first, so a subfolder failing half-way adds none of its files
+        try:
+            subfolder_entries = list(iter_xlsx_entries(subfolder.path, recursive))
+        except OSError as e:
+            print(f"Skipped folder {subfolder.path}: {e}")
+            continue
+        yield from subfolder_entries
+
+
+def get_xlsx_file_paths_in_folder(folder_path, recursive=None):
+    """
+    Returns a list of Excel file paths in a folder with an '.xlsx' extension.
+
+    Args:
+        folder_path (str): The path of the folder to search.
+        recursive (bool): Also search the subfolders. None uses scan_subfolders.
+
+    Returns:
+        list: A list of Excel file paths within the specified folder with an '.xlsx' extension, in name order.
+    """
+    if recursive is None:
+        recursive = scan_subfolders
+    try:
+        return [entry.path for entry in iter_xlsx_entries(folder_path, recursive)]
+    except FileNotFoundError:
+        print(f"Folder not found: {folder_path}")
+        return []
+    except OSError as e:
+        print(f"Could not read folder {folder_path}: {e}")
+        return []
+
+
+def get_file_name(excel_file, folder=None):
+    """
+    Returns the name of a workbook in the reports, its 'file' value.
+
+    With scan_subfolders, workbooks with the same name can be in different subfolders, so they are named by their
+    path relative to the scanned folder (with '/' separators, the same on every machine). Otherwise it's the file
+    name.
+
+    Args:
+        excel_file (str): The path of the workbook.
+        folder (str): The scanned folder, defaults to source_folder.
+    """
+    if folder is None:
+        folder = source_folder
+    if scan_subfolders and folder is not None:
+        return os.path.relpath(excel_file, folder).replace(os.sep, '/')
+    return os.path.basename(excel_file)
+
+
+# Chinese chars calc
+
+# Inclusive codepoint ranges of every character count_chinese_characters_by_name() counts, generated with
+# build_cjk_codepoint_ranges() for the Unicode version below. Other Python builds rebuild the table on first use.
+cjk_ranges_unicode_version = '14.0.0'
+cjk_codepoint_ranges = [
+    (0x3000, 0x303F), (0x3041, 0x3096), (0x3099, 0x30FF), (0x31F0, 0x31FF), (0x32D0, 0x32FE),
+    (0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xAC00, 0xD7A3), (0xFF00, 0xFFEF), (0x1AFF0, 0x1AFF3),
+    (0x1AFF5, 0x1AFFB), (0x1AFFD, 0x1AFFE), (0x1B000, 0x1B001), (0x1B11F, 0x1B122), (0x1B150, 0x1B152),
+    (0x1B164, 0x1B167), (0x1F200, 0x1F202), (0x1F210, 0x1F23B), (0x1F240, 0x1F248), (0x20000, 0x2A6DF),
+    (0x2A700, 0x2B738), (0x2B740, 0x2B81D), (0x2B820, 0x2CEA1), (0x2CEB0, 0x2EBE0), (0x30000, 0x3134A),
+]
+
+# Built lazily by get_cjk_character_regex()
+cjk_character_regex = None
+
+
+def is_cjk_character_name(unicode_name, unicode_codepoint):
+    # Check for CJK Unified Ideographs (used in Chinese, Japanese, and Korean)
+    if 'CJK UNIFIED IDEOGRAPH' in unicode_name:
+        return True
+    # Check for Hiragana and Katakana (used in Japanese)
+    if 'HIRAGANA' in unicode_name or 'KATAKANA' in unicode_name:
+        return True
+    # Check for Hangul Syllables (used in Korean)
+    if 'HANGUL SYLLABLE' in unicode_name:
+        return True
+    # Check for CJK Symbols and Punctuation, Halfwidth and Fullwidth Forms
+    return 0x3000 <= unicode_codepoint <= 0x303F or 0xFF00 <= unicode_codepoint <= 0xFFEF
+
+
+def build_cjk_codepoint_ranges():
+    """
+    Scans all Unicode codepoints and returns the ranges of characters counted as CJK.
+
+    Returns:
+        list: A list of (first, last) inclusive codepoint tuples.
+    """
+    ranges = []
+    for codepoint in range(sys.maxunicode + 1):
+        if not is_cjk_character_name(unicodedata.name(chr(codepoint), ''), codepoint):
+            continue
+        if ranges and ranges[-1][1] == codepoint - 1:
+            ranges[-1] = (ranges[-1][0], codepoint)
+        else:
+            ranges.append((codepoint, codepoint))
+    return ranges
+
+
+def get_cjk_character_regex():
+    """
+    Returns a compiled character class of every codepoint counted as CJK.
+    """
+    global cjk_character_regex
+    if cjk_character_regex is None:
+        ranges = cjk_codepoint_ranges
+        if unicodedata.unidata_version != cjk_ranges_unicode_version:
+            ranges = build_cjk_codepoint_ranges()
+        cjk_character_regex = re.compile(
+            '[' + ''.join(f'{re.escape(chr(first))}-{re.escape(chr(last))}' for first, last in ranges) + ']')
+    return cjk_character_regex
+
+
+def count_chinese_characters(s):
+    """
+    Counts the number of Chinese characters or words in a string.
+
+    Args:
+        s (str): The string to count Chinese characters or words in.
+
+    Returns:
+        int: The number of Chinese characters or words in the string.
+    """
+    s = str(s)
+
+    global cjk_or_words_count  # this is to turn Chinese or Word calculation on or off
+
+    if cjk_or_words_count == 'Words':
+        return len(s.split())
+    return len(get_cjk_character_regex().findall(s))
+
+
+def count_chinese_characters_by_name(s):
+    """
+    Reference implementation of count_chinese_characters() with a unicodedata.name() lookup per character.
+    It is much slower, and is kept to verify and benchmark the CJK codepoint ranges.
+    """
+    s = str(s)
+
+    global cjk_or_words_count
+
+    if cjk_or_words_count == 'Words':
+        return len(s.split())
+    count = 0
+    for c in s:
+        if is_cjk_character_name(unicodedata.name(c, ''), ord(c)):
+            count += 1
+    return count
+
+
+def set_placeholder_patterns(patterns=None):
+    """
+    Replaces the hardcoded regex_pattern with project-specific placeholder patterns.
+
+    Args:
+        patterns (list): Regular expressions, any of which counts as one placeholder. None restores regex_pattern.
+
+    Raises:
+        ValueError: If a pattern isn't a valid regular expression, or the patterns can't be combined.
+    """
+    global placeholder_regex
+    if not patterns:
+        placeholder_regex = re.compile(regex_pattern)
+        return
+    for pattern in patterns:
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid placeholder pattern '{pattern}': {e}") from e
+    try:
+        placeholder_regex = re.compile('|'.join(f'(?:{pattern})' for pattern in patterns))
+    except re.error as e:
+        # E.g. the same group name in two patterns
+        raise ValueError(f"The placeholder patterns can't be combined: {e}") from e
+
+
+def load_placeholder_patterns(file_path):
+    # One regular expression per line, empty lines and lines starting with '#' are skipped
+    with open(file_path, encoding='utf-8') as patterns_file:
+        return [line.rstrip('\r\n') for line in patterns_file if line.strip() and not line.startswith('#')]
+
+
+def count_regex(input_string):
+    if not isinstance(input_string, str):
+        return 0
+    # subn() only counts the matches, unlike findall() it doesn't build a list of group tuples
+    return placeholder_regex.subn('', input_string)[1]
+
+
+class StringCountMemo:
+    """
+    Size-bounded LRU memo of the character and placeholder counts of strings.
+
+    Game sources repeat the same UI labels and item names across files and sheets, so one memo lives for a whole
+    run. It can be saved to a file to seed the next run and the worker processes.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # A list collects the strings counted since, for worker processes to send back to the main process
+        self.added = None
+        # The counts are only valid for the options they were made with
+        self.options = (cjk_or_words_count, placeholder_regex.pattern)
+
+    def get(self, string):
+        counts = self.counts.get(string)
+        if counts is not None:
+            self.hits += 1
+            self.counts.move_to_end(string)
+            return counts
+        self.misses += 1
+        counts = measure_string(string)
+        self.put(string, counts)
+        if self.added is not None:
+            self.added.append((string, counts))
+        return counts
+
+    def put(self, string, counts):
+        self.counts[string] = counts
+        if len(self.counts) > self.capacity:
+            self.counts.popitem(last=False)
+
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def save(self, file_path):
+        memo_dir = os.path.dirname(file_path)
+        if memo_dir:
+            os.makedirs(memo_dir, exist_ok=True)
+        temp_path = f'{file_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as memo_file_object:
+            pickle.dump({'options': self.options, 'counts': list(self.counts.items())}, memo_file_object)
+        os.replace(temp_path, file_path)
+
+    def load(self, file_path):
+        # A missing, unreadable or differently counted memo file is ignored
+        try:
+            with open(file_path, 'rb') as memo_file_object:
+                saved = pickle.load(memo_file_object)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return
+        if saved.get('options') != self.options:
+            return
+        for string, counts in saved['counts'][-self.capacity:]:
+            self.counts[string] = counts
+
+
+def start_string_count_memo():
+    # A fresh memo for a run, seeded from memo_file
+    global string_counts
+    string_counts = StringCountMemo(memo_size) if memo_size > 0 else None
+    if string_counts is not None and memo_file:
+        string_counts.load(memo_file)
+    return string_counts
+
+
+def count_string(value):
+    """
+    Returns the (characters, placeholders) counts of a cell value, through the run's memo if there is one.
+    """
+    if string_counts is None or not isinstance(value, str):
+        return measure_string(value)
+    return string_counts.get(value)
+
+
+def measure_string(value):
+    # The counts of a value, with the time of each count added to string_count_seconds when timing is on
+    if not timing_enabled:
+        return count_chinese_characters(value), count_regex(value)
+    start = time.perf_counter()
+    characters = count_chinese_characters(value)
+    middle = time.perf_counter()
+    placeholders = count_regex(value)
+    string_count_seconds['characters'] += middle - start
+    string_count_seconds['placeholders'] += time.perf_counter() - middle
+    return characters, placeholders
+
+
+# Create a new DataFrame with headers from the report_headers argument
+def create_report_dataframe(report_headers):
+    # Create an empty DataFrame with the specified headers
+    df = pd.DataFrame(columns=report_headers)
+    return df
+
+
+def iter_selected_rows(rows, indexes):
+    """
+    Yields the values at the given indexes of every row, the way pandas.read_excel() would read them.
+
+    Missing cells and pandas' NA strings become NaN, and the empty rows at the end of the sheet are dropped.
+    Empty rows are only counted until the next non-empty one, so memory doesn't grow with the sheet.
+
+    Args:
+        rows (iterable): Tuples of cell values, e.g. openpyxl's iter_rows(values_only=True).
+        indexes (list): The positions of the wanted columns.
+    """
+    from pandas._libs.parsers import STR_NA_VALUES
+
+    empty_row = tuple(np.nan for _ in indexes)
+    empty_rows_pending = 0
+    for row in rows:
+        if all(value is None or value == '' for value in row):
+            empty_rows_pending += 1
+            continue
+        for _ in range(empty_rows_pending):
+            yield empty_row
+        empty_rows_pending = 0
+        selected = []
+        for index in indexes:
+            value = row[index] if index < len(row) else None
+            if value is None or (isinstance(value, str) and value in STR_NA_VALUES):
+                value = np.nan
+            selected.append(value)
+        yield tuple(selected)
+
+
+def iter_sheet_columns(excel_file, columns, required=None):
+    """
+    Streams the given columns of every sheet of an Excel file, without materializing the other columns.
+
+    Args:
+        excel_file (str): The path of the Excel file.
+        columns (list): The header names of the wanted columns.
+        required (list): The columns a sheet must have to be read. Defaults to all of the columns.
+
+    Yields:
+        tuple: (sheet name, list of missing columns, list of found columns, generator of row tuples in the order
+            of the found columns). The generator is None if a required column is missing from the header row.
+    """
+    from openpyxl import load_workbook
+
+    if required is None:
+        required = columns
+    wb = load_workbook(excel_file, read_only=True, data_only=True, keep_links=False)
+    try:
+        for ws in wb.worksheets:
+            # Read-only mode trusts the size stored in the sheet, which exporters often get wrong, pandas resets it too
+            ws.reset_dimensions()
+            rows = ws.iter_rows(values_only=True)
+            header = list(next(rows, ()))
+            missing = [column for column in columns if column not in header]
+            found = [column for column in columns if column in header]
+            if any(column in missing for column in required):
+                yield ws.title, missing, found, None
+            else:
+                yield ws.title, missing, found, iter_selected_rows(rows, [header.index(column) for column in found])
+    finally:
+        wb.close()
+
+
+def load_sheet_columns(excel_file, columns, required=None):
+    """
+    Loads only the given columns of every sheet of an Excel file.
+
+    Sheets that don't have all the required columns are reported and skipped.
+
+    Args:
+        excel_file (str): The path of the Excel file.
+        columns (list): The header names of the wanted columns.
+        required (list): The columns a sheet must have. Defaults to all of the columns, the others are left out of
+            the sheet's DataFrame when they are missing.
+
+    Returns:
+        dict: Sheet names mapped to DataFrames with the given columns.
+    """
+    filename_with_extension = get_file_name(excel_file)
+    unique_columns = list(dict.fromkeys(columns))
+    sheets_data = {}
+    for sheet_name, missing, found, rows in iter_sheet_columns(excel_file, unique_columns, required):
+        if rows is None:
+            print(f"{filename_with_extension}: sheet '{sheet_name}' has no column {', '.join(map(str, missing))}, "
+                  f"skipped")
+            continue
+        data = pd.DataFrame.from_records(list(rows), columns=found)
+        # Same column twice (e.g. the same source and target) gives two columns, like data[[a, a]] does
+        sheets_data[sheet_name] = data[[column for column in columns if column in found]]
+    return sheets_data
+
+
+def load_language_columns(excel_file, columns, required=None):
+    # Reads the columns from the sidecar file when sidecars are switched on, see load_sheet_columns()
+    if sidecar_folder:
+        import sidecar
+
+        return sidecar.load_sheet_columns_from_sidecar(excel_file, columns, sidecar_folder, required)
+    return load_sheet_columns(excel_file, columns, required)
+
+
+# Turn the whole Excel into a dict of dfs (this is faster than opening one by one)
+def load_sheets_as_dict(excel_file, source_lang, target_lang):
+    # Only the two columns are read, the other language columns are never materialized
+    return load_language_columns(excel_file, [source_lang, target_lang])
+
+
+def get_column_values(data, column_name):
+    # The same language as source and target gives two columns with one name
+    column = data[column_name]
+    if isinstance(column, pd.DataFrame):
+        column = column.iloc[:, 0]
+    return column.tolist()
+
+
+def value_key(value):
+    # NaN is never equal to itself, None gives all the empty cells one key, like drop_duplicates() does
+    return None if isinstance(value, float) and value != value else value
+
+
+def count_source_metrics(data, source_lang):
+    """
+    Counts the target-independent part of a sheet's report row in one pass over the source column.
+
+    Every distinct source string is counted once, and its counts are reused for all its repeats.
+
+    Returns:
+        dict: 'unique', 'source_chars' and 'regex_number', plus the per-row 'keys' of the source strings and the
+            'characters' count of every distinct key, for count_target_metrics().
+    """
+    occurrences = Counter()
+    representatives = {}
+    keys = []
+    for value in get_column_values(data, source_lang):
+        key = value_key(value)
+        if key not in representatives:
+            representatives[key] = value
+        occurrences[key] += 1
+        keys.append(key)
+
+    characters = {}
+    unique = source_chars = regex_number = 0
+    for key, repeats in occurrences.items():
+        count, placeholders = count_string(representatives[key])
+        characters[key] = count
+        unique += count
+        source_chars += count * repeats
+        regex_number += placeholders * repeats
+    return {'unique': unique, 'source_chars': source_chars, 'regex_number': regex_number,
+            'keys': keys, 'characters': characters}
+
+
+def count_target_metrics(data, target_lang, source_metrics):
+    """
+    Counts the translated volume of a sheet from the source counts of count_source_metrics().
+
+    Returns:
+        tuple: (translated characters of all rows, translated characters of the distinct source/target pairs).
+    """
+    characters = source_metrics['characters']
+    translated_pairs = Counter((key, value_key(target))
+                               for key, target in zip(source_metrics['keys'], get_column_values(data, target_lang))
+                               if target == target)  # not NaN
+    translated_all = translated_unique = 0
+    for (key, _), repeats in translated_pairs.items():
+        translated_all += characters[key] * repeats
+        translated_unique += characters[key]
+    return translated_all, translated_unique
+
+
+def make_report_row(filename_with_extension, sheet_name, data, source_lang, target_lang, source_metrics=None):
+    """
+    Calculates the report row of one sheet.
+
+    Args:
+        filename_with_extension (str): The file name for the 'file' column.
+        sheet_name (str): The sheet name for the 'Key' column.
+        data (DataFrame): The sheet with the source and target columns.
+        source_lang (str): The source language column.
+        target_lang (str): The target language column.
+        source_metrics (dict): The result of count_source_metrics(), when it's shared between several targets.
+
+    Returns:
+        dict: The report columns of the sheet.
+    """
+    if source_metrics is None:
+        source_metrics = count_source_metrics(data, source_lang)
+    translated_all, translated_unique = count_target_metrics(data, target_lang, source_metrics)
+    report_row = build_report_row(filename_with_extension, sheet_name, source_metrics['source_chars'],
+                                  source_metrics['unique'], source_metrics['regex_number'], translated_all,
+                                  translated_unique)
+    if selection_unique_or_all == 'Unique across project':
+        translated_keys = {key for key, target in zip(source_metrics['keys'], get_column_values(data, target_lang))
+                           if target == target}  # not NaN
+        digests = {key: value_digest(float('nan') if key is None else key) for key in source_metrics['characters']}
+        report_row[project_strings_column] = make_project_strings(
+            {digests[key]: count for key, count in source_metrics['characters'].items()},
+            {digests[key] for key in translated_keys})
+    return report_row
+
+
+def make_project_strings(characters, translated):
+    """
+    Packs the distinct source strings of a sheet for the "Unique across project" mode, see attribute_project_strings().
+
+    Only digests are kept, so the strings of the whole project don't have to fit in memory.
+
+    Args:
+        characters (dict): value_digest() of every distinct source string mapped to its character count.
+        translated (set): The digests of the strings that are translated in at least one row.
+
+    Returns:
+        tuple: numpy arrays of the digests, the character counts and the translated flags.
+    """
+    count = len(characters)
+    return (np.frombuffer(b''.join(characters), dtype=np.uint64),
+            np.fromiter(characters.values(), dtype=np.int64, count=count),
+            np.fromiter((digest in translated for digest in characters), dtype=bool, count=count))
+
+
+def attribute_project_strings(report_dataframe):
+    """
+    Splits the volume of every sheet into the strings seen for the first time in the project and the repeated ones.
+
+    Every distinct source string is attributed to its first occurrence in file and sheet order: that sheet gets its
+    characters as 'Source Wordcount' and 'New Unique', every later sheet with it as 'Repeated'. 'Translated' is the
+    part of the new strings that is translated there, and the fuzzy bands (when add_fuzzy_bands() added them to the
+    project strings) split the untranslated part of them.
+
+    Args:
+        report_dataframe (DataFrame): Report rows with the project_strings_column, without the 'Total' row.
+
+    Returns:
+        DataFrame: The report with the project counts and without the project_strings_column.
+    """
+    sheet_strings = list(report_dataframe.pop(project_strings_column))
+    if not sheet_strings:
+        return report_dataframe
+    digests = np.concatenate([strings[0] for strings in sheet_strings])
+    characters = np.concatenate([strings[1] for strings in sheet_strings])
+    translated = np.concatenate([strings[2] for strings in sheet_strings])
+    sheets = np.repeat(np.arange(len(sheet_strings)), [len(strings[0]) for strings in sheet_strings])
+
+    # A sorted index of the digests finds the first occurrence of each of them
+    is_new = np.zeros(len(digests), dtype=bool)
+    is_new[np.unique(digests, return_index=True)[1]] = True
+
+    def sum_by_sheet(weights):
+        return [int(value) for value in np.bincount(sheets, weights=weights, minlength=len(sheet_strings))]
+
+    new_unique = sum_by_sheet(characters * is_new)
+    new_translated = sum_by_sheet(characters * (is_new & translated))
+    repeated = sum_by_sheet(characters * ~is_new)
+
+    report_dataframe['Source Wordcount'] = new_unique
+    report_dataframe['Translated'] = new_translated
+    report_dataframe['Not_translated'] = [total - done for total, done in zip(new_unique, new_translated)]
+    report_dataframe['Completeness'] = [int((done / total) * 100) if total > 0 else 0
+                                        for total, done in zip(new_unique, new_translated)]
+    report_dataframe['New Unique'] = new_unique
+    report_dataframe['Repeated'] = repeated
+    columns = ['Source Wordcount', 'Translated', 'Not_translated', 'Completeness'] + project_headers
+    if all(len(strings) == 4 for strings in sheet_strings):
+        bands = np.concatenate([strings[3] for strings in sheet_strings])
+        untranslated_new = is_new & ~translated
+        for number, band in enumerate(fuzzy_headers):
+            report_dataframe[band] = sum_by_sheet(characters * (untranslated_new & (bands == number)))
+        columns += fuzzy_headers
+    return report_dataframe.astype({column: object for column in columns})
+
+
+def with_optional_headers(report_headers):
+    # The fuzzy bands, and for "Unique across project" the new/repeated split and the per-sheet strings it's worked
+    # out from
+    report_headers = list(report_headers)
+    if fuzzy_bands:
+        report_headers += fuzzy_headers
+    if selection_unique_or_all == 'Unique across project':
+        report_headers += project_headers + [project_strings_column]
+    return report_headers
+
+
+def build_report_row(filename_with_extension, sheet_name, source_chars, unique, regex_number, translated_all,
+                     translated_unique):
+    # Picks the counts of the selected "All strings" / "Unique only" mode and works out the percentages
+    global selection_unique_or_all
+    if selection_unique_or_all == 'All strings':
+        translated_chars = translated_all
+        untranslated_chars = source_chars - translated_chars
+    else:
+        translated_chars = translated_unique
+        untranslated_chars = unique - translated_chars
+        source_chars = unique
+
+    if source_chars > 0:
+        completeness = int((translated_chars / source_chars) * 100)
+        code_and_variables_perc = int((regex_number / source_chars) * 100)
+    else:
+        completeness = 0
+        code_and_variables_perc = 0
+
+    return {"Key": sheet_name,
+            "Source Wordcount": source_chars,
+            "Translated": translated_chars,
+            "Not_translated": untranslated_chars,
+            "file": filename_with_extension,
+            "Completeness": completeness,
+            "Variables ratio": code_and_variables_perc,
+            "Source Unique": unique}
+
+
+# take file path and parameters, return a df to concatenate into the report df
+def process_excel_file(excel_file, source_lang, target_lang, report_headers):
+    # Read the source and target columns of every sheet into memory
+    filename_with_extension = get_file_name(excel_file)
+    start = time.perf_counter()
+    all_sheets = load_sheets_as_dict(excel_file, source_lang, target_lang)
+    rows = sum(len(data) for data in all_sheets.values())
+    record_stage('load', filename_with_extension, time.perf_counter() - start, rows)
+    start = time.perf_counter()
+    report = process_sheets(filename_with_extension, all_sheets, source_lang, target_lang, report_headers)
+    record_stage('sheets', filename_with_extension, time.perf_counter() - start, rows)
+    return report
+
+
+def process_sheets(filename_with_extension, all_sheets, source_lang, target_lang, report_headers):
+    # Collect plain row dicts and build the DataFrame once, growing it with pd.concat per sheet is quadratic
+    sheets = [(data, count_source_metrics(data, source_lang)) for data in all_sheets.values()]
+    if detail_writer is not None:
+        for sheet_name, data in all_sheets.items():
+            detail_writer.write_rows(sheet_name, ((source, *count_string(source), target == target)
+                                                  for source, target in zip(get_column_values(data, source_lang),
+                                                                            get_column_values(data, target_lang))))
+    report_rows = [make_report_row(filename_with_extension, sheet_name, data, source_lang, target_lang,
+                                   source_metrics)
+                   for sheet_name, (data, source_metrics) in zip(all_sheets, sheets)]
+    if fuzzy_bands:
+        add_fuzzy_bands(report_rows, sheets, target_lang)
+    return make_report_rows_dataframe(report_rows, report_headers)
+
+
+def get_trigrams(string):
+    # Padded, so strings shorter than three characters get trigrams too
+    padded = f'\x02{string}\x03'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def get_similarity(string, other, minimum=75):
+    """
+    Returns the Levenshtein similarity of two strings in percent, the way translation memories rate fuzzy matches.
+
+    Args:
+        string (str): The first string.
+        other (str): The second string.
+        minimum (int): Similarities below this aren't worked out exactly, 0 is returned for them.
+
+    Returns:
+        int: 100 for equal strings, down to 0.
+    """
+    longest = max(len(string), len(other))
+    if longest == 0:
+        return 100
+    # The edit distance a similarity of at least `minimum` allows
+    max_distance = longest * (100 - minimum) // 100
+    if abs(len(string) - len(other)) > max_distance:
+        return 0
+    distance = get_bounded_distance(string, other, max_distance)
+    if distance > max_distance:
+        return 0
+    return (longest - distance) * 100 // longest
+
+
+def get_bounded_distance(string, other, max_distance):
+    """
+    Returns the Levenshtein distance of two strings, or max_distance + 1 if it's larger.
+
+    Only a band of the edit matrix around its diagonals is filled: a path through the cell (i, j) costs at least
+    |j - i| to get there and |length difference - (j - i)| from there to the end, the cells where that adds up to more
+    than max_distance can't be on a cheap enough path. That is O(n * max_distance) instead of O(n * m).
+    """
+    too_far = max_distance + 1
+    other_length = len(other)
+    length_difference = other_length - len(string)
+    slack = (max_distance - abs(length_difference)) // 2
+    # The band of j - i
+    lowest = min(0, length_difference) - slack
+    highest = max(0, length_difference) + slack
+    previous = [j if j <= highest else too_far for j in range(other_length + 1)]
+    for i, char in enumerate(string, 1):
+        first = max(1, i + lowest)
+        last = min(other_length, i + highest)
+        # The cells outside the band stay too_far
+        current = [too_far] * (other_length + 1)
+        if i <= -lowest:
+            current[0] = i
+        row_minimum = current[first - 1]
+        for j in range(first, last + 1):
+            cost = previous[j - 1] + (char != other[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost
+            if cost < row_minimum:
+                row_minimum = cost
+        if row_minimum > max_distance:
+            return too_far
+        previous = current
+    return min(previous[other_length], too_far)
+
+
+class FuzzyMatchIndex:
+    """
+    Trigram inverted index of translated source strings, to find the best fuzzy match of a string without comparing
+    it to all of them.
+
+    The candidates are the strings close enough in length that share enough trigrams to possibly reach the lowest
+    band, only the fuzzy_candidate_limit of them sharing the most trigrams get the exact edit distance check.
+    """
+
+    def __init__(self, strings):
+        self.strings = list(strings)
+        self.exact = set(self.strings)
+        postings = defaultdict(list)
+        trigram_counts = []
+        for string_id, string in enumerate(self.strings):
+            trigrams = get_trigrams(string)
+            trigram_counts.append(len(trigrams))
+            for trigram in trigrams:
+                postings[trigram].append(string_id)
+        # numpy arrays, so the candidates of a lookup are counted and filtered without a Python loop over them
+        self.postings = {trigram: np.array(string_ids, dtype=np.int64) for trigram, string_ids in postings.items()}
+        self.lengths = np.array([len(string) for string in self.strings], dtype=np.int64)
+        self.trigram_counts = np.array(trigram_counts, dtype=np.int64)
+
+    def best_similarity(self, string):
+        if string in self.exact:
+            return 100
+        trigrams = get_trigrams(string)
+        postings = []
+        common = []
+        for trigram in trigrams:
+            string_ids = self.postings.get(trigram)
+            if string_ids is None:
+                continue
+            # Trigrams most strings have don't tell the candidates apart
+            if len(string_ids) <= fuzzy_common_trigram_limit:
+                postings.append(string_ids)
+            else:
+                common.append(string_ids)
+        if not postings:
+            if not common:
+                return 0
+            # Every trigram is common, e.g. the string is a template most strings are made from: the least common
+            # trigram still narrows the candidates down
+            common.sort(key=len)
+            postings.append(common.pop(0))
+        # Trigrams that weren't counted, the candidates may share them too
+        uncounted = len(common)
+        string_ids, shared = np.unique(np.concatenate(postings), return_counts=True)
+
+        lowest = fuzzy_band_limits[-1][0]
+        length = len(string)
+        lengths = self.lengths[string_ids]
+        max_distances = np.maximum(lengths, length) * (100 - lowest) // 100
+        # An edit changes at most 3 trigrams of a string, so two strings within max_distance edits share all but
+        # 3 * max_distance of the trigrams of either of them
+        possible = shared + uncounted
+        eligible = ((lengths * 100 >= length * lowest) & (length * 100 >= lengths * lowest)
+                    & (possible >= len(trigrams) - 3 * max_distances)
+                    & (possible >= self.trigram_counts[string_ids] - 3 * max_distances))
+
+        best = 0
+        for string_id, _ in heapq.nlargest(fuzzy_candidate_limit,
+                                           zip(string_ids[eligible].tolist(), shared[eligible].tolist()),
+                                           key=itemgetter(1)):
+            best = max(best, get_similarity(string, self.strings[string_id], max(best, lowest)))
+            # Only an equal string is more similar, and those were found above
+            if best >= 99:
+                break
+        return best
+
+
+def get_fuzzy_band(similarity):
+    for minimum, band in fuzzy_band_limits:
+        if similarity >= minimum:
+            return band
+    return fuzzy_no_match
+
+
+def add_fuzzy_bands(report_rows, sheets, target_lang):
+    """
+    Adds the fuzzy match band columns to the report rows of a file.
+
+    The translated source strings of all the sheets are indexed, then the volume of every untranslated string goes to
+    the band of its best match: all of its rows for "All strings", once per sheet for the unique modes. The bands
+    cover the same strings as 'Not_translated': in the unique modes a string translated in any row of the sheet is
+    translated. For "Unique across project", the bands of the distinct strings are also added to the project strings,
+    and summed again over the strings new to each sheet by attribute_project_strings().
+
+    Args:
+        report_rows (list): The report row dicts of the sheets, updated in place.
+        sheets (list): (data, source metrics) tuples of the same sheets, see count_source_metrics().
+        target_lang (str): The target language column.
+    """
+    untranslated_by_sheet = []
+    translated_by_sheet = []
+    # A dict keeps the strings in sheet order, so candidates sharing as many trigrams rank the same on every run
+    translated = {}
+    for data, source_metrics in sheets:
+        untranslated = Counter()
+        sheet_translated = set()
+        for key, target in zip(source_metrics['keys'], get_column_values(data, target_lang)):
+            if target == target:  # not NaN
+                translated[key] = None
+                sheet_translated.add(key)
+            else:
+                untranslated[key] += 1
+        untranslated_by_sheet.append(untranslated)
+        translated_by_sheet.append(sheet_translated)
+
+    index = FuzzyMatchIndex(key for key in translated if isinstance(key, str))
+    all_strings = selection_unique_or_all == 'All strings'
+    band_numbers = {band: number for number, band in enumerate(fuzzy_headers)}
+    bands = {}
+    for report_row, (_, source_metrics), untranslated, sheet_translated in zip(report_rows, sheets,
+                                                                              untranslated_by_sheet,
+                                                                              translated_by_sheet):
+        volumes = dict.fromkeys(fuzzy_headers, 0)
+        sheet_bands = {}
+        for key, repeats in untranslated.items():
+            if not all_strings and key in sheet_translated:
+                continue
+            if key not in bands:
+                if key in translated:
+                    bands[key] = fuzzy_band_limits[0][1]
+                elif isinstance(key, str):
+                    bands[key] = get_fuzzy_band(index.best_similarity(key))
+                else:
+                    bands[key] = fuzzy_no_match
+            sheet_bands[key] = band_numbers[bands[key]]
+            characters = source_metrics['characters'][key]
+            volumes[bands[key]] += characters * repeats if all_strings else characters
+        report_row.update(volumes)
+        if project_strings_column in report_row:
+            # The band number of every distinct string, in the order of make_project_strings(), -1 when translated
+            report_row[project_strings_column] += (
+                np.fromiter((sheet_bands.get(key, -1) for key in source_metrics['characters']), dtype=np.int8,
+                            count=len(source_metrics['characters'])),)
+
+
+def make_report_rows_dataframe(report_rows, report_headers):
+    # Object columns, like the rows concatenated to an empty report DataFrame used to have
+    return pd.DataFrame(report_rows, columns=report_headers, dtype=object)
+
+
+def value_digest(value):
+    """
+    Returns a short digest of a cell value, equal for the values drop_duplicates() treats as duplicates.
+    """
+    if isinstance(value, str):
+        key = 's' + value
+    elif isinstance(value, float) and value != value:
+        key = 'n'
+    else:
+        key = 'o' + str(value)
+    return hashlib.blake2b(key.encode('utf-8', 'surrogatepass'), digest_size=8).digest()
+
+
+def process_excel_file_streaming(excel_file, source_lang, target_lang, report_headers):
+    """
+    Same as process_excel_file(), but counts every row as it's read from the workbook.
+
+    Only running counters and the digests of the distinct source strings (for "Unique only") of the current sheet are
+    kept, so memory doesn't grow with the size of the file.
+    """
+    filename_with_extension = get_file_name(excel_file)
+    start = time.perf_counter()
+    report_rows = []
+    rows_read = 0
+    project_mode = selection_unique_or_all == 'Unique across project'
+    for sheet_name, missing, found, rows in iter_sheet_columns(excel_file, [source_lang, target_lang]):
+        if rows is None:
+            print(f"{filename_with_extension}: sheet '{sheet_name}' has no column {', '.join(map(str, missing))}, "
+                  f"skipped")
+            continue
+        # With the same source and target language there is only one column
+        if len(found) == 1:
+            rows = ((value, value) for value, in rows)
+
+        source_chars = translated_all = unique = translated_unique = regex_number = 0
+        seen_sources = set()
+        seen_pairs = set()
+        project_characters = {}
+        translated_sources = set()
+        for row_number, (source, target) in enumerate(rows, 2):
+            rows_read += 1
+            characters, placeholders = count_string(source)
+            if detail_writer is not None:
+                detail_writer.write_row(sheet_name, row_number, source, characters, placeholders, target == target)
+            source_chars += characters
+            regex_number += placeholders
+            source_digest = value_digest(source)
+            if source_digest not in seen_sources:
+                seen_sources.add(source_digest)
+                unique += characters
+                if project_mode:
+                    project_characters[source_digest] = characters
+            if target == target:  # not NaN
+                translated_all += characters
+                if project_mode:
+                    translated_sources.add(source_digest)
+                pair_digest = source_digest + value_digest(target)
+                if pair_digest not in seen_pairs:
+                    seen_pairs.add(pair_digest)
+                    translated_unique += characters
+
+        report_row = build_report_row(filename_with_extension, sheet_name, source_chars, unique, regex_number,
+                                      translated_all, translated_unique)
+        if project_mode:
+            report_row[project_strings_column] = make_project_strings(project_characters, translated_sources)
+        report_rows.append(report_row)
+
+    record_stage('stream', filename_with_extension, time.perf_counter() - start, rows_read)
+    peak_memory = get_peak_memory()
+    peak_memory_text = f"{peak_memory / 1024 / 1024:.0f} MB" if peak_memory else "unknown"
+    print(f"{filename_with_extension}: {rows_read} rows streamed, peak RSS {peak_memory_text}")
+    return make_report_rows_dataframe(report_rows, report_headers)
+
+
+def get_peak_memory():
+    """
+    Returns the peak resident set size of this process in bytes, or None if the platform doesn't tell.
+    """
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == 'darwin' else peak * 1024
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        get_process_memory_info = ctypes.windll.psapi.GetProcessMemoryInfo
+        get_process_memory_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD]
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if get_process_memory_info(handle, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    return None
+
+
+def process_excel_file_multi(excel_file, source_lang, target_langs, report_headers):
+    """
+    Same as process_excel_file() for several target languages, reading the workbook and counting the source once.
+
+    Returns:
+        dict: Target languages mapped to the DataFrames process_excel_file() would return for them.
+    """
+    filename_with_extension = get_file_name(excel_file)
+    start = time.perf_counter()
+    all_sheets = load_language_columns(excel_file, [source_lang] + list(target_langs), required=[source_lang])
+    rows = sum(len(data) for data in all_sheets.values())
+    record_stage('load', filename_with_extension, time.perf_counter() - start, rows)
+
+    start = time.perf_counter()
+    report_rows = {target_lang: [] for target_lang in target_langs}
+    sheets = {target_lang: [] for target_lang in target_langs}
+    for sheet_name, data in all_sheets.items():
+        source_metrics = count_source_metrics(data, source_lang)
+        for target_lang in target_langs:
+            if target_lang not in data.columns:
+                print(f"{filename_with_extension}: sheet '{sheet_name}' has no column {target_lang}, skipped for "
+                      f"{target_lang}")
+                continue
+            report_rows[target_lang].append(make_report_row(filename_with_extension, sheet_name, data, source_lang,
+                                                            target_lang, source_metrics))
+            sheets[target_lang].append((data, source_metrics))
+    if fuzzy_bands:
+        for target_lang in target_langs:
+            add_fuzzy_bands(report_rows[target_lang], sheets[target_lang], target_lang)
+
+    reports = {target_lang: make_report_rows_dataframe(target_rows, report_headers)
+               for target_lang, target_rows in report_rows.items()}
+    record_stage('sheets', filename_with_extension, time.perf_counter() - start, rows)
+    return reports
+
+
+def get_processing_options():
+    # Everything a worker process needs to count exactly like this one
+    return {'unique_or_all': selection_unique_or_all,
+            'count_mode': cjk_or_words_count,
+            'placeholder_pattern': placeholder_regex.pattern,
+            'sidecar_folder': sidecar_folder,
+            'streaming_mode': streaming_mode,
+            'memo_size': memo_size,
+            'memo_file': memo_file,
+            'fuzzy_bands': fuzzy_bands,
+            'timing_enabled': timing_enabled,
+            'detail_path': detail_path,
+            'detail_placeholder_minimum': detail_placeholder_minimum,
+            'scan_subfolders': scan_subfolders,
+            'source_folder': source_folder}
+
+
+def get_result_options():
+    # The options that change the numbers in the report, the rest only change how they are calculated
+    options = get_processing_options()
+    result_options = {name: options[name]
+                      for name in ('unique_or_all', 'count_mode', 'placeholder_pattern', 'fuzzy_bands')}
+    if scan_subfolders and source_folder is not None:
+        # The 'file' values are relative to the scanned folder then, see get_file_name()
+        result_options['source_folder'] = os.path.abspath(source_folder)
+    return result_options
+
+
+def set_processing_options(options):
+    global placeholder_regex, sidecar_folder, streaming_mode, memo_size, memo_file, fuzzy_bands, timing_enabled
+    global detail_path, detail_placeholder_minimum, scan_subfolders, source_folder
+    set_counting_options(options['unique_or_all'], options['count_mode'])
+    placeholder_regex = re.compile(options['placeholder_pattern'])
+    sidecar_folder = options['sidecar_folder']
+    streaming_mode = options['streaming_mode']
+    memo_size = options['memo_size']
+    memo_file = options['memo_file']
+    fuzzy_bands = options['fuzzy_bands']
+    timing_enabled = options['timing_enabled']
+    detail_path = options['detail_path']
+    detail_placeholder_minimum = options['detail_placeholder_minimum']
+    scan_subfolders = options['scan_subfolders']
+    source_folder = options['source_folder']
+
+
+def start_worker(options):
+    # Initializer of the worker processes: the same options and a memo of their own
+    set_processing_options(options)
+    start_string_count_memo()
+
+
+def process_file_in_worker(process_function, *args):
+    # Also returns the memo hits and misses and the stage timings of this file, so the main process can report them,
+    # and with a memo_file the strings counted for it, so the main process can save them
+    hits, misses = (string_counts.hits, string_counts.misses) if string_counts is not None else (0, 0)
+    stage_timings.clear()
+    if string_counts is None:
+        return process_one_file(process_function, *args), 0, 0, list(stage_timings), []
+    string_counts.added = [] if memo_file else None
+    result = process_one_file(process_function, *args)
+    added, string_counts.added = string_counts.added or [], None
+    return result, string_counts.hits - hits, string_counts.misses - misses, list(stage_timings), added
+
+
+def process_one_file(process_function, excel_file, *args):
+    # Runs one of the process_excel_file*() functions, with the part file of its detail rows when they are written
+    global detail_writer
+    if detail_path is None:
+        return process_timed(process_function, excel_file, *args)
+    import report_detail
+
+    detail_writer = report_detail.DetailPartWriter(report_detail.get_part_path(detail_path, excel_file),
+                                                   get_file_name(excel_file), detail_placeholder_minimum)
+    try:
+        result = process_timed(process_function, excel_file, *args)
+    except BaseException:
+        detail_writer.discard()
+        raise
+    else:
+        detail_writer.close()
+    finally:
+        detail_writer = None
+    return result
+
+
+def process_timed(process_function, excel_file, *args):
+    # Runs process_function, recording how long the file and its string counting took
+    if not timing_enabled:
+        return process_function(excel_file, *args)
+    string_count_seconds.update(characters=0.0, placeholders=0.0)
+    start = time.perf_counter()
+    result = process_function(excel_file, *args)
+    filename_with_extension = get_file_name(excel_file)
+    record_stage('characters', filename_with_extension, string_count_seconds['characters'])
+    record_stage('placeholders', filename_with_extension, string_count_seconds['placeholders'])
+    record_stage('file', filename_with_extension, time.perf_counter() - start)
+    return result
+
+
+def start_timing():
+    # Forgets the timings of the previous run
+    global timing_started
+    stage_timings.clear()
+    timing_started = time.perf_counter()
+
+
+def record_stage(stage, file_name, seconds, rows=None):
+    """
+    Records the time of a stage when timing is on.
+
+    Args:
+        stage (str): The stage, e.g. 'load'.
+        file_name (str): The file the stage worked on, 'All files' for the stages of the whole report.
+        seconds (float): The wall time of the stage.
+        rows (int): The rows the stage went through, if it's known.
+
+    The stage also gets the peak memory of the process (the worker process for files processed in one) when it
+    ended. That is a high-water mark that never goes down, not the memory the stage itself used: tracing the
+    allocations of every stage with tracemalloc makes the counting several times slower, which defeats the timings.
+    """
+    if not timing_enabled:
+        return
+    peak_memory = get_peak_memory()
+    stage_timings.append({'file': file_name, 'stage': stage, 'seconds': seconds, 'rows': rows,
+                          'process_peak_mb': round(peak_memory / 1024 / 1024) if peak_memory else None})
+
+
+def make_timing_dataframe(records):
+    """
+    Returns the stage timings as a DataFrame for the 'Timing' sheet, with a 'Total' row of the run's wall time.
+    """
+    rows = [{'File': record['file'], 'Stage': record['stage'], 'Seconds': round(record['seconds'], 3),
+             'Rows': record['rows'] if record['rows'] is not None else '',
+             'Rows per second': round(record['rows'] / record['seconds']) if record['rows'] and record['seconds']
+             else '',
+             'Process peak MB': record['process_peak_mb'] if record['process_peak_mb'] is not None else ''}
+            for record in records]
+    total_seconds = time.perf_counter() - timing_started if timing_started is not None else ''
+    rows.append({'File': 'Total', 'Stage': '-', 'Seconds': round(total_seconds, 3) if total_seconds != '' else '',
+                 'Rows': '', 'Rows per second': '', 'Process peak MB': ''})
+    return pd.DataFrame(rows, columns=timing_headers, dtype=object)
+
+
+def print_timings(records):
+    # One line per file, then the totals of every stage
+    files = {}
+    totals = {}
+    for record in records:
+        files.setdefault(record['file'], []).append(record)
+        totals[record['stage']] = totals.get(record['stage'], 0.0) + record['seconds']
+    print("Timing:")
+    for file_name, file_records in files.items():
+        parts = []
+        for record in file_records:
+            part = f"{record['stage']} {record['seconds']:.3f}s"
+            if record['rows'] and record['seconds']:
+                part += f" ({record['rows']} rows, {record['rows'] / record['seconds']:,.0f} rows/s)"
+            parts.append(part)
+        peak_memory = max((record['process_peak_mb'] or 0) for record in file_records)
+        print(f"  {file_name}: {', '.join(parts)}" + (f", process peak {peak_memory} MB" if peak_memory else ""))
+    print("  All stages: " + ', '.join(f"{stage} {seconds:.3f}s" for stage, seconds in totals.items()))
+
+
+def save_timings(records, file_path):
+    totals = {}
+    for record in records:
+        totals[record['stage']] = totals.get(record['stage'], 0.0) + record['seconds']
+    with open(file_path, 'w', encoding='utf-8') as timing_file:
+        json.dump({'version': current_version, 'stages': records, 'totals': totals}, timing_file, indent=2)
+
+
+class ReportCancelled(Exception):
+    """
+    Raised by process_files() when the run was cancelled through its cancel_event.
+    """
+
+
+def process_files(file_list, source_lang, target_lang, report_headers, workers=1, errors=None, cache=None,
+                  progress=None, cancel_event=None):
+    """
+    Processes Excel files one by one or in a pool of worker processes.
+
+    A file that fails to process is reported and skipped, the rest of the files are still processed.
+
+    Args:
+        file_list (list): Excel file paths.
+        source_lang (str): The source language column.
+        target_lang (str): The target language column, or a list of them for process_excel_file_multi().
+        report_headers (list): The report columns.
+        workers (int): The number of worker processes. 1 processes files in this process, 0 uses all CPU cores.
+        errors (list): If given, (file path, error message) tuples of the skipped files are appended to it.
+        cache (ReportCache): If given, unchanged files are taken from it and processed files are stored in it.
+        progress (callable): Called as progress(files done, number of files, file path) after every file, from the
+            thread that called process_files().
+        cancel_event (threading.Event): When set, the files that haven't started yet are dropped and
+            ReportCancelled is raised.
+
+    Returns:
+        list: The DataFrames of the processed files, in the order of file_list.
+
+    Raises:
+        ReportCancelled: If cancel_event was set before all the files were processed.
+    """
+    if errors is None:
+        errors = []
+    options = get_processing_options()
+    result_options = get_result_options()
+
+    # A list of target languages reads each workbook once for all of them
+    if isinstance(target_lang, (list, tuple)):
+        process_function = process_excel_file_multi
+    elif streaming_mode:
+        process_function = process_excel_file_streaming
+        if fuzzy_bands:
+            # Streaming leaves the fuzzy band columns empty, its results are only for other streaming runs
+            result_options['streaming_mode'] = True
+    else:
+        process_function = process_excel_file
+
+    results = [None] * len(file_list)
+    pending = []
+    for index, file_path in enumerate(file_list):
+        # The detail rows are only written while a workbook is read, so cached results can't be used for them
+        if cache is not None and detail_path is None:
+            try:
+                results[index] = cache.get(file_path, source_lang, target_lang, result_options)
+            except OSError as e:
+                print(f"Skipped {file_path}: {e}")
+                errors.append((file_path, str(e)))
+                continue
+        if results[index] is None:
+            pending.append(index)
+    if cache is not None and detail_path is None:
+        print(f"Cache: {len(file_list) - len(pending)} file(s) unchanged, {len(pending)} to process")
+
+    files_done = len(file_list) - len(pending)
+
+    def report_progress(index):
+        nonlocal files_done
+        files_done += 1
+        if progress is not None:
+            progress(files_done, len(file_list), file_list[index])
+
+    def store(index, result):
+        results[index] = result
+        if cache is not None:
+            cache.put(file_list[index], source_lang, target_lang, result_options, result)
+        report_progress(index)
+
+    def skip(index, error):
+        print(f"Skipped {file_list[index]}: {error}")
+        errors.append((file_list[index], str(error)))
+        report_progress(index)
+
+    def is_cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(pending))
+
+    memo = start_string_count_memo()
+    memo_hits = memo_misses = 0
+
+    if workers <= 1:
+        for index in pending:
+            if is_cancelled():
+                break
+            try:
+                store(index, process_one_file(process_function, file_list[index], source_lang, target_lang,
+                                              report_headers))
+            except Exception as e:
+                skip(index, e)
+        if memo is not None:
+            memo_hits, memo_misses = memo.hits, memo.misses
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=start_worker, initargs=(options,)) as executor:
+            futures = [executor.submit(process_file_in_worker, process_function, file_list[index], source_lang,
+                                       target_lang, report_headers) for index in pending]
+            # Collect in submission order, so the report doesn't depend on which worker finished first
+            for index, future in zip(pending, futures):
+                if is_cancelled():
+                    # The files already running are finished, the queued ones never start
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    break
+                try:
+                    result, hits, misses, records, added = future.result()
+                    stage_timings.extend(records)
+                    store(index, result)
+                    memo_hits += hits
+                    memo_misses += misses
+                    if memo is not None:
+                        for string, counts in added:
+                            memo.put(string, counts)
+                except Exception as e:
+                    skip(index, e)
+
+    if is_cancelled() and files_done < len(file_list):
+        raise ReportCancelled(f"Cancelled after {files_done} of {len(file_list)} file(s)")
+
+    if memo is not None:
+        if memo_file:
+            memo.save(memo_file)
+        if memo_stats and memo_hits + memo_misses:
+            print(f"String count memo: {memo_hits / (memo_hits + memo_misses):.1%} hit ratio "
+                  f"({memo_hits} hits, {memo_misses} misses, {len(memo.counts)} of {memo.capacity} entries)")
+
+    return [result for result in results if result is not None]
+
+
+def process_list_of_excels(report_dataframe, file_list, source_lang, target_lang, report_headers, workers=1,
+                           errors=None, cache=None, progress=None, cancel_event=None):
+    file_results = process_files(file_list, source_lang, target_lang, with_optional_headers(report_headers), workers,
+                                 errors, cache, progress, cancel_event)
+    return combine_file_results(report_dataframe, file_results, report_headers)
+
+
+def process_list_of_excels_multi(file_list, source_lang, target_langs, report_headers, workers=1, errors=None,
+                                 cache=None, progress=None, cancel_event=None):
+    """
+    Same as process_list_of_excels() for several target languages, each workbook is read once.
+
+    Returns:
+        dict: Target languages mapped to their report DataFrames.
+    """
+    file_results = process_files(file_list, source_lang, list(target_langs), with_optional_headers(report_headers),
+                                 workers, errors, cache, progress, cancel_event)
+    return {target_lang: combine_file_results(create_report_dataframe(report_headers),
+                                              [result[target_lang] for result in file_results], report_headers)
+            for target_lang in target_langs}
+
+
+def combine_file_results(report_dataframe, file_results, report_headers):
+    start = time.perf_counter()
+    frames = [report_dataframe]
+    for current_result in file_results:
+
+        # Check if the headers match
+        if not set(current_result.columns) == set(report_dataframe.columns):
+            # Add missing columns to report_dataframe with empty values
+            for column in report_headers:
+                if column not in current_result.columns:
+                    current_result[column] = ""
+
+        frames.append(current_result)
+
+    # Concatenate everything at once, appending the files one by one copies the report every time
+    report_dataframe = pd.concat(frames, ignore_index=True)
+    if project_strings_column in report_dataframe.columns:
+        report_dataframe = attribute_project_strings(report_dataframe)
+
+    # Calculate the sum of the relevant columns
+    sum_columns = ['Source Wordcount', 'Translated', 'Not_translated']
+    sum_columns += [column for column in fuzzy_headers + project_headers if column in report_dataframe.columns]
+    sum_row = report_dataframe[sum_columns].sum().to_frame().T
+    sum_row['file'] = 'Total'
+    sum_row['Key'] = '-'
+
+    # Append the sum row to the bottom of the dataframe
+    report_dataframe = pd.concat([report_dataframe, sum_row], ignore_index=True)
+    record_stage('combine', 'All files', time.perf_counter() - start, len(report_dataframe) - 1)
+
+    return report_dataframe
+
+
+def make_summary_dataframe(reports):
+    """
+    Puts the reports of several target languages side by side, one row per sheet.
+
+    Args:
+        reports (dict): Target languages mapped to report DataFrames with the 'Total' row.
+
+    Returns:
+        DataFrame: 'file', 'Key' and the source counts, then the translated count and completeness of each language.
+    """
+    summary = None
+    for target_lang, report in reports.items():
+        columns = report[['file', 'Key', 'Source Wordcount', 'Source Unique', 'Translated', 'Completeness']]
+        columns = columns.rename(columns={'Translated': f'{target_lang} Translated',
+                                          'Completeness': f'{target_lang} Completeness'})
+        if summary is None:
+            summary = columns
+        else:
+            # A sheet can be missing a target column, so only the sheet identity is joined on
+            summary = summary.merge(columns, on=['file', 'Key'], how='outer', sort=False,
+                                    suffixes=('', f' ({target_lang})'))
+            for column in ('Source Wordcount', 'Source Unique'):
+                summary[column] = summary[column].fillna(summary.pop(f'{column} ({target_lang})'))
+    # Keep the 'Total' row at the bottom after the outer joins
+    is_total = summary['file'] == 'Total'
+    return pd.concat([summary[~is_total], summary[is_total]], ignore_index=True)
+
+
+def format_and_save_to_excel(df, filepath):
+    # Create a new Excel workbook and add a worksheet, streamed to the file in write-only mode
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    format_worksheet(wb.create_sheet(), df)
+
+    # Save the workbook to the specified filepath
+    wb.save(filepath)
+
+
+def format_and_save_sheets_to_excel(sheets, filepath):
+    """
+    Saves several reports into one workbook, a formatted worksheet for each.
+
+    Args:
+        sheets (dict): Worksheet titles mapped to report DataFrames.
+        filepath (str): Where to save the workbook.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    for title, df in sheets.items():
+        format_worksheet(wb.create_sheet(title=str(title)[:31]), df)
+    wb.save(filepath)
+
+
+# Report styles, created once by get_report_styles() and shared by all the cells
+report_styles = None
+
+
+def get_report_styles():
+    """
+    Returns the report styles by name: 'header_font', 'center_alignment', 'wrap_alignment', 'complete_fill' and
+    'warning_fill'.
+    """
+    global report_styles
+    if report_styles is None:
+        from openpyxl.styles import Alignment, Font, PatternFill
+
+        report_styles = {
+            'header_font': Font(bold=True),
+            'center_alignment': Alignment(horizontal='center', vertical='center'),
+            'wrap_alignment': Alignment(wrap_text=True, horizontal='center', vertical='center'),
+            'complete_fill': PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid"),
+            'warning_fill': PatternFill(start_color="FFC0CB", end_color="FFC0CB", fill_type="solid"),
+        }
+    return report_styles
+
+
+def get_file_merge_ranges(file_names):
+    """
+    Returns the row ranges of the 'file' column to merge, for the report rows below the header.
+
+    The last row (the 'Total' row) is never merged, and the row above it joins the range before it.
+
+    Args:
+        file_names (list): The 'file' values of the report rows, including the 'Total' row.
+
+    Returns:
+        list: (first row, last row) tuples of worksheet row numbers.
+    """
+    merge_ranges = []
+    max_row = len(file_names) + 1
+    start_merge = 2
+    for row_idx in range(2, max_row):
+        if row_idx == max_row - 1:  # Check if this is the second last row
+            merge_ranges.append((start_merge, row_idx))
+            break
+        if file_names[row_idx - 2] == file_names[start_merge - 2]:
+            continue
+        else:
+            merge_ranges.append((start_merge, row_idx - 1))
+            start_merge = row_idx
+    return merge_ranges
+
+
+def make_cell_styles(ws):
+    """
+    Registers every combination of the report styles in the workbook once.
+
+    Returns:
+        dict: (font, fill, alignment) tuples mapped to the style arrays to copy into cells.
+    """
+    from openpyxl.cell import WriteOnlyCell
+
+    report_style = get_report_styles()
+    styles = {}
+    for font in (None, report_style['header_font']):
+        for fill in (None, report_style['complete_fill'], report_style['warning_fill']):
+            for alignment in (report_style['center_alignment'], report_style['wrap_alignment']):
+                template = WriteOnlyCell(ws)
+                if font is not None:
+                    template.font = font
+                if fill is not None:
+                    template.fill = fill
+                template.alignment = alignment
+                styles[font, fill, alignment] = template._style
+    return styles
+
+
+def format_worksheet(ws, df):
+    """
+    Writes a report DataFrame to a write-only worksheet with the report formatting.
+
+    The role of every column is worked out once from the header, and the cells copy styles registered once by
+    make_cell_styles() instead of looking them up in the workbook for every cell.
+    """
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+    from openpyxl.utils.dataframe import dataframe_to_rows
+
+    styles = make_cell_styles(ws)
+    report_style = get_report_styles()
+    header_font, complete_fill, warning_fill = (report_style['header_font'], report_style['complete_fill'],
+                                                report_style['warning_fill'])
+    center_alignment, wrap_alignment = report_style['center_alignment'], report_style['wrap_alignment']
+    headers = list(df.columns)
+    is_completeness = [str(header).endswith('Completeness') for header in headers]
+    is_variables_ratio = [header == 'Variables ratio' for header in headers]
+    column_file = headers.index('file') if 'file' in headers else None
+
+    rows = list(dataframe_to_rows(df, index=False, header=True))
+    merge_ranges = []
+    merged_rows = set()
+    if column_file is not None:
+        merge_ranges = get_file_merge_ranges([row[column_file] for row in rows[1:]])
+        for first_row, last_row in merge_ranges:
+            merged_rows.update(range(first_row + 1, last_row + 1))
+
+    # Row and column formatting has to be set before the rows are streamed
+    ws.freeze_panes = 'A2'  # Freeze the header row
+    ws.row_dimensions[1].height = 30  # Set header row height to 30 (double the default height)
+    ws.column_dimensions['A'].width = 40  # 'file' column
+    ws.column_dimensions['B'].width = 40  # 'Key' column
+    for col_idx in range(2, len(headers)):
+        ws.column_dimensions[get_column_letter(col_idx + 1)].width = 15
+
+    for r_idx, row in enumerate(rows):
+        cells = []
+        for c_idx, value in enumerate(row):
+            # Only the first cell of a merged range keeps its value and style
+            if c_idx == column_file and r_idx + 1 in merged_rows:
+                cells.append(None)
+                continue
+
+            font = fill = None
+            if r_idx == 0:
+                font = header_font
+            elif is_completeness[c_idx]:
+                value_float = float(value)
+                if value_float == 100:
+                    fill = complete_fill
+                elif value_float == 0:
+                    fill = warning_fill
+                value = f'{value}%'
+            elif is_variables_ratio[c_idx]:
+                value_float = float(value) if isinstance(value, int) else value
+                if value_float > 5:
+                    fill = warning_fill
+                value = f'{value_float}%'
+
+            # Apply word wrapping to the first two columns and the header row
+            alignment = wrap_alignment if c_idx < 2 or r_idx == 0 else center_alignment
+            cell = WriteOnlyCell(ws, value=value)
+            cell._style = copy(styles[font, fill, alignment])
+            cells.append(cell)
+        ws.append(cells)
+
+    for first_row, last_row in merge_ranges:
+        ws.merged_cells.add(f"{get_column_letter(column_file + 1)}{first_row}:"
+                            f"{get_column_letter(column_file + 1)}{last_row}")
+
+
+# Variables that shouldn't be changed
+report_headers_variable = [
+    "file",
+    "Key",
+    "Source Wordcount",
+    "Translated",
+    "Not_translated",
+    "Completeness",
+    "Translator",
+    "Proofreader",
+    "Batch 1",
+    "Batch 2",
+    "Batch 3",
+    "Batch 4",
+    "Batch 5",
+    "Batch 6",
+    "Live",
+    "Variables ratio",
+    "Source Unique"
+]
+# Filled with the untranslated volume of every sheet by the detail export, see report_detail.assign_batches()
+batch_headers = [header for header in report_headers_variable if header.startswith('Batch ')]
+# Added with fuzzy_bands, from the best to no match. The band of a string is the first one it reaches the minimum
+# similarity of, the 100% band is for strings translated in another row
+fuzzy_band_limits = [(100, "Fuzzy 100%"), (95, "Fuzzy 95-99%"), (85, "Fuzzy 85-94%"), (75, "Fuzzy 75-84%")]
+fuzzy_no_match = "No match"
+fuzzy_headers = [band for _, band in fuzzy_band_limits] + [fuzzy_no_match]
+# How many index candidates get the exact similarity check, and how common a trigram can be to select candidates
+fuzzy_candidate_limit = 20
+fuzzy_common_trigram_limit = 2000
+
+# The columns of the 'Timing' sheet. Not 'file', its cells aren't merged like the report's
+timing_headers = ["File", "Stage", "Seconds", "Rows", "Rows per second", "Process peak MB"]
+
+# Added by the "Unique across project" mode, project_strings_column only lives until the files are combined
+project_headers = ["New Unique", "Repeated"]
+project_strings_column = "Project strings"
+language_codes = ['RU', 'ES', 'FR', 'ID', 'JP', 'KR', 'PT', 'RU', 'TH', 'VI', 'TR', 'IT', 'CHS', 'en', 'kr', 'cht',
+                  'jp', 'th', 'vi', 'id', 'es', 'ru', 'pt', 'de', 'fr', 'CHT', 'DE', 'EN',
+                  'chs']
+
+
+def read_and_save(df, wordlist, source, target, headers, output, workers=1, errors=None, cache=None, progress=None,
+                  cancel_event=None):
+    start_timing()
+    one_file_df = process_list_of_excels(df, wordlist, source, target, headers, workers, errors, cache, progress,
+                                         cancel_event)
+    save_report({'Sheet': one_file_df}, output)
+    return one_file_df
+
+
+def record_history(report, folder, source_lang, target_lang, history_path):
+    """
+    Appends the sheets of a report to the history store, see report_history.
+
+    A history that can't be written is reported, the report itself is already saved.
+    """
+    import report_history
+    import sqlite3
+
+    try:
+        history = report_history.ReportHistory(history_path)
+        try:
+            history.record_run(report, folder, source_lang, target_lang, get_result_options())
+        finally:
+            history.close()
+    except (OSError, sqlite3.Error) as e:
+        print(f"Could not add the report to the history {history_path}: {e}")
+
+
+def save_report(sheets, output_path):
+    """
+    Saves the report sheets, with the 'Timing' sheet when it's switched on, then prints and saves the timings.
+
+    Args:
+        sheets (dict): Worksheet titles mapped to report DataFrames.
+        output_path (str): Where to save the workbook.
+    """
+    if timing_enabled and timing_sheet:
+        sheets = {**sheets, 'Timing': make_timing_dataframe(stage_timings)}
+    start = time.perf_counter()
+    if len(sheets) == 1:
+        format_and_save_to_excel(next(iter(sheets.values())), output_path)
+    else:
+        format_and_save_sheets_to_excel(sheets, output_path)
+    record_stage('write', 'All files', time.perf_counter() - start, sum(len(df) for df in sheets.values()))
+    if timing_enabled:
+        print_timings(stage_timings)
+        if timing_json:
+            save_timings(stage_timings, timing_json)
+
+
+def set_counting_options(unique_or_all=None, count_mode=None):
+    """
+    Switches the module-level counting options used by the processing functions.
+
+    Args:
+        unique_or_all (str): "All strings", "Unique only" or "Unique across project". None keeps the current value.
+        count_mode (str): "Chinese" or "Words". None keeps the current value.
+    """
+    global selection_unique_or_all, cjk_or_words_count
+    if unique_or_all is not None:
+        if unique_or_all not in unique_or_all_options:
+            raise ValueError(f"Unknown strings option: {unique_or_all}")
+        selection_unique_or_all = unique_or_all
+    if count_mode is not None:
+        if count_mode not in count_options:
+            raise ValueError(f"Unknown count option: {count_mode}")
+        cjk_or_words_count = count_mode
+
+
+def generate_report(folder, source_lang, target_lang, unique_or_all='All strings', count_mode='Chinese',
+                    output_path=None, placeholder_patterns=None, workers=1, errors=None, cache=None,
+                    sidecar_folder_path=None, streaming=False, memo_entries=100000, memo_path=None,
+                    print_memo_stats=False, fuzzy=False, progress=None, cancel_event=None, timing=False,
+                    timing_sheet_enabled=False, timing_json_path=None, export_paths=None, history_path=None,
+                    subfolders=False, detail_file=None, detail_placeholders=None):
+    """
+    Runs the whole report pipeline without the GUI.
+
+    Args:
+        folder (str): The folder with source *.xlsx files.
+        source_lang (str): The source language column, e.g. 'CHS'.
+        target_lang (str): The target language column, e.g. 'RU'. A list of them makes one report per language
+            from a single pass over the workbooks, saved as a 'Summary' sheet and a sheet per language.
+        unique_or_all (str): "All strings", "Unique only" or "Unique across project".
+        count_mode (str): "Chinese" or "Words".
+        output_path (str): Where to save the formatted report. If None, the workbook isn't written.
+        placeholder_patterns (list): Project-specific placeholder regexes used instead of regex_pattern.
+        workers (int): The number of worker processes. 1 processes files one by one, 0 uses all CPU cores.
+        errors (list): If given, (file path, error message) tuples of the files that failed are appended to it.
+        cache (ReportCache): If given, only the files that changed since they were cached are processed.
+        sidecar_folder_path (str): If given, columns are read from sidecar files in this folder, which are
+            extracted from the workbooks on first use.
+        streaming (bool): Count rows while they are read from the workbooks, so memory stays bounded by the largest
+            sheet's unique strings. Applies to a single target language and reads the workbooks, not the sidecars.
+        memo_entries (int): How many strings the per-string count memo keeps across files, 0 switches it off.
+        memo_path (str): If given, the memo is seeded from this file, and saved to it after the run, including the
+            strings counted by the worker processes.
+        print_memo_stats (bool): Print the memo's hit ratio at the end of the run.
+        fuzzy (bool): Add the fuzzy match band columns, which split the untranslated volume by how close it is to
+            translated strings of the same file. Not available with streaming.
+        progress (callable): Called as progress(files done, number of files, file path) after every file.
+        cancel_event (threading.Event): Set it to stop the run between files, ReportCancelled is raised then.
+        timing (bool): Print the wall time and rows of every stage of every file after the run, with the peak
+            memory of the process so far.
+        timing_sheet_enabled (bool): Also add the timings to the report as a 'Timing' sheet.
+        timing_json_path (str): Also save the timings to this JSON file.
+        export_paths (list): Also write the report for other tools to these files, as CSV, JSON Lines or Parquet
+            depending on the extension, see report_sinks.
+        history_path (str): Also append the sheets of the report to this history store, see report_history.
+        subfolders (bool): Also read the workbooks in the subfolders of the folder, named by their path relative to
+            it in the report.
+        detail_file (str): Also write every untranslated row (file, sheet, row, source text and counts) to this .csv
+            or .parquet file while the workbooks are read, grouped into the batches of the 'Batch 1'-'Batch 6'
+            columns, see report_detail. Applies to a single target language, and cached results aren't used.
+        detail_placeholders (int): With detail_file, also write the translated rows with at least this many
+            placeholders.
+
+    Returns:
+        DataFrame: The report, including the 'Total' row. For a list of target languages, a dict of them.
+    """
+    set_counting_options(unique_or_all, count_mode)
+    set_placeholder_patterns(placeholder_patterns)
+    global sidecar_folder, streaming_mode, memo_size, memo_file, memo_stats, fuzzy_bands
+    global timing_enabled, timing_sheet, timing_json, scan_subfolders, source_folder, detail_path
+    global detail_placeholder_minimum
+    sidecar_folder = sidecar_folder_path
+    scan_subfolders = subfolders
+    source_folder = folder
+    detail_path = None
+    detail_placeholder_minimum = detail_placeholders
+    streaming_mode = streaming
+    memo_size = memo_entries
+    memo_file = memo_path
+    memo_stats = print_memo_stats
+    fuzzy_bands = fuzzy
+    timing_sheet = timing_sheet_enabled
+    timing_json = timing_json_path
+    timing_enabled = bool(timing or timing_sheet or timing_json)
+    start_timing()
+    if fuzzy_bands and streaming_mode and not isinstance(target_lang, (list, tuple)):
+        print("Fuzzy match bands need whole sheets in memory, they are left empty in streaming mode")
+    if export_paths:
+        import report_sinks
+
+        # Unknown formats fail before the files are processed
+        for export_path in export_paths:
+            report_sinks.get_sink(export_path)
+    if detail_file and isinstance(target_lang, (list, tuple)):
+        print("The detail export is for a single target language, no detail file is written")
+    elif detail_file:
+        import report_detail
+
+        report_detail.check_detail_path(detail_file)
+        detail_path = detail_file
+    file_list = get_xlsx_file_paths_in_folder(folder)
+    if isinstance(target_lang, (list, tuple)):
+        report = process_list_of_excels_multi(file_list, source_lang, target_lang, report_headers_variable, workers,
+                                              errors, cache, progress, cancel_event)
+    elif detail_path:
+        report_detail.start_parts(detail_path)
+        try:
+            report = process_list_of_excels(create_report_dataframe(report_headers_variable), file_list, source_lang,
+                                            target_lang, report_headers_variable, workers, errors, cache, progress,
+                                            cancel_event)
+            rows = report_detail.merge_parts(file_list, detail_path,
+                                             report_detail.assign_batches(report, batch_headers))
+        finally:
+            report_detail.remove_parts(detail_path)
+            detail_path = None
+        print(f"{rows} detail row(s) written to {detail_file}")
+    else:
+        report = process_list_of_excels(create_report_dataframe(report_headers_variable), file_list, source_lang,
+                                        target_lang, report_headers_variable, workers, errors, cache, progress,
+                                        cancel_event)
+    if output_path:
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        if isinstance(report, dict):
+            save_report({'Summary': make_summary_dataframe(report), **report}, output_path)
+        else:
+            save_report({'Sheet': report}, output_path)
+    elif timing_enabled:
+        print_timings(stage_timings)
+        if timing_json:
+            save_timings(stage_timings, timing_json)
+    if export_paths:
+        report_sinks.export_report(report, export_paths)
+    if history_path:
+        record_history(report, folder, source_lang, target_lang, history_path)
+    return report
@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+
+import report_core
+
+pd = report_core.LazyModule('pandas', globals(), 'pd')
+
+default_snapshot_path = os.path.join(os.getcwd(), 'cache', 'snapshot.sqlite')
+default_key_column = 'ID'
+
+# Bump when the layout of the snapshot rows changes, older snapshots are then refused
+snapshot_format_version = 1
+
+delta_headers = ["file", "Key", "Status", "Added", "Changed", "Removed", "Newly translated", "Reverted"]
+delta_volume_columns = delta_headers[3:]
+
+
+def get_sheet_rows(data, source_lang, target_lang, key_column=default_key_column):
+    """
+    Hashes the rows of a sheet for comparing it with another snapshot.
+
+    Rows are identified by the key column, or by their position when the sheet doesn't have it. A key that occurs
+    several times gets one row per occurrence.
+
+    Returns:
+        tuple: (hash of the whole sheet, dict of row keys mapped to (source digest, translated, source characters)).
+    """
+    sources = report_core.get_column_values(data, source_lang)
+    targets = report_core.get_column_values(data, target_lang)
+    if key_column in data.columns:
+        keys = report_core.get_column_values(data, key_column)
+    else:
+        keys = range(len(sources))
+
+    sheet_hash = hashlib.blake2b(digest_size=16)
+    rows = {}
+    occurrences = {}
+    for position, (key, source, target) in enumerate(zip(keys, sources, targets)):
+        key = report_core.value_key(key)
+        if key is None:
+            key = f'row {position}'
+        occurrence = occurrences[key] = occurrences.get(key, -1) + 1
+        row_key = (key, occurrence)
+        source_digest = report_core.value_digest(source)
+        translated = target == target  # not NaN
+        sheet_hash.update(repr(row_key).encode('utf-8', 'surrogatepass') + source_digest + bytes([translated]))
+        rows[row_key] = (source_digest, translated, report_core.count_string(source)[0])
+    return sheet_hash.digest(), rows
+
+
+def file_fingerprint(excel_file):
+    stat = os.stat(excel_file)
+    return [os.path.abspath(excel_file), stat.st_size, stat.st_mtime_ns]
+
+
+def take_snapshot(file_list, source_lang, target_lang, key_column=default_key_column, previous=None,
+                  folder=None):
+    """
+    Reads the row hashes of every sheet of the Excel files.
+
+    Args:
+        file_list (list): Excel file paths.
+        source_lang (str): The source language column.
+        target_lang (str): The target language column.
+        key_column (str): The column that identifies the rows of a sheet.
+        previous (dict): An earlier snapshot. Files that haven't changed since it was taken are copied from it
+            instead of being read again.
+        folder (str): The scanned folder, with scan_subfolders the files are named by their path relative to it.
+
+    Returns:
+        dict: File names (see report_core.get_file_name()) mapped to
+            {'fingerprint': ..., 'sheets': {sheet name: (sheet hash, rows)}}.
+    """
+    snapshot = {}
+    reused = 0
+    for excel_file in file_list:
+        file_name = report_core.get_file_name(excel_file, folder)
+        fingerprint = file_fingerprint(excel_file)
+        if previous is not None and file_name in previous and previous[file_name]['fingerprint'] == fingerprint:
+            snapshot[file_name] = previous[file_name]
+            reused += 1
+            continue
+        all_sheets = report_core.load_language_columns(excel_file, [key_column, source_lang, target_lang],
+                                                       required=[source_lang, target_lang])
+        snapshot[file_name] = {'fingerprint': fingerprint,
+                               'sheets': {sheet_name: get_sheet_rows(data, source_lang, target_lang, key_column)
+                                          for sheet_name, data in all_sheets.items()}}
+    if previous is not None:
+        print(f"Snapshot: {reused} file(s) unchanged, {len(file_list) - reused} read")
+    return snapshot
+
+
+def get_snapshot_options(source_lang, target_lang, key_column):
+    # A snapshot is only comparable when it was counted the same way
+    return json.dumps([snapshot_format_version, source_lang, target_lang, key_column,
+                       report_core.cjk_or_words_count])
+
+
+def save_snapshot(snapshot, path, source_lang, target_lang, key_column=default_key_column):
+    snapshot_dir = os.path.dirname(path)
+    if snapshot_dir:
+        os.makedirs(snapshot_dir, exist_ok=True)
+    # Written next to the old snapshot and swapped in, so an interrupted run keeps the previous one
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    connection = sqlite3.connect(temp_path)
+    try:
+        connection.execute('CREATE TABLE meta (options TEXT)')
+        connection.execute('CREATE TABLE files (file_name TEXT PRIMARY KEY, snapshot BLOB)')
+        connection.execute('INSERT INTO meta VALUES (?)', (get_snapshot_options(source_lang, target_lang, key_column),))
+        connection.executemany('INSERT INTO files VALUES (?, ?)',
+                               ((file_name, pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+                                for file_name, entry in snapshot.items()))
+        connection.commit()
+    finally:
+        connection.close()
+    os.replace(temp_path, path)
+
+
+def load_snapshot(path, source_lang, target_lang, key_column=default_key_column):
+    """
+    Loads a snapshot saved by save_snapshot().
+
+    Raises:
+        ValueError: If the snapshot was taken for other languages, key column or counting option.
+    """
+    connection = sqlite3.connect(path)
+    try:
+        options = connection.execute('SELECT options FROM meta').fetchone()[0]
+        if options != get_snapshot_options(source_lang, target_lang, key_column):
+            raise ValueError(f"The snapshot {path} was taken with other options: {options}")
+        return {file_name: pickle.loads(entry)
+                for file_name, entry in connection.execute('SELECT file_name, snapshot FROM files')}
+    finally:
+        connection.close()
+
+
+def compare_sheet(old_rows, new_rows):
+    """
+    Returns the changed volumes of a sheet, in the order of delta_volume_columns.
+
+    A row whose source changed counts as changed only, whatever happened to its translation.
+    """
+    added = changed = removed = newly_translated = reverted = 0
+    for row_key, (source_digest, translated, characters) in new_rows.items():
+        old_row = old_rows.get(row_key)
+        if old_row is None:
+            added += characters
+        elif old_row[0] != source_digest:
+            changed += characters
+        elif translated and not old_row[1]:
+            newly_translated += characters
+        elif old_row[1] and not translated:
+            reverted += characters
+    for row_key, (_, _, characters) in old_rows.items():
+        if row_key not in new_rows:
+            removed += characters
+    return [added, changed, removed, newly_translated, reverted]
+
+
+def compare_snapshots(old_snapshot, new_snapshot):
+    """
+    Builds the change report between two snapshots, one row per added, removed or changed sheet.
+
+    Sheets with the same hash in both snapshots are skipped without looking at their rows.
+
+    Returns:
+        DataFrame: The delta_headers columns, with a 'Total' row.
+    """
+    report_rows = []
+
+    def add_row(file_name, sheet_name, status, volumes):
+        if any(volumes):
+            report_rows.append(dict(zip(delta_headers, [file_name, sheet_name, status] + volumes)))
+
+    for file_name in list(new_snapshot) + [name for name in old_snapshot if name not in new_snapshot]:
+        old_sheets = old_snapshot[file_name]['sheets'] if file_name in old_snapshot else None
+        new_sheets = new_snapshot[file_name]['sheets'] if file_name in new_snapshot else None
+        if old_sheets is None:
+            for sheet_name, (_, rows) in new_sheets.items():
+                add_row(file_name, sheet_name, 'New file', compare_sheet({}, rows))
+            continue
+        if new_sheets is None:
+            for sheet_name, (_, rows) in old_sheets.items():
+                add_row(file_name, sheet_name, 'Removed file', compare_sheet(rows, {}))
+            continue
+        for sheet_name, (sheet_hash, rows) in new_sheets.items():
+            if sheet_name not in old_sheets:
+                add_row(file_name, sheet_name, 'New sheet', compare_sheet({}, rows))
+            elif old_sheets[sheet_name][0] != sheet_hash:
+                add_row(file_name, sheet_name, 'Changed', compare_sheet(old_sheets[sheet_name][1], rows))
+        for sheet_name, (_, rows) in old_sheets.items():
+            if sheet_name not in new_sheets:
+                add_row(file_name, sheet_name, 'Removed sheet', compare_sheet(rows, {}))
+
+    delta = pd.DataFrame(report_rows, columns=delta_headers, dtype=object)
+    sum_row = {column: sum(delta[column]) for column in delta_volume_columns}
+    sum_row.update({'file': 'Total', 'Key': '-', 'Status': '-'})
+    return pd.concat([delta, pd.DataFrame([sum_row], columns=delta_headers, dtype=object)], ignore_index=True)
+
+
+def generate_delta_report(folder, source_lang, target_lang, previous_folder=None, snapshot_path=None,
+                          output_path=None, key_column=default_key_column, count_mode='Chinese'):
+    """
+    Compares the source folder with a previous drop and saves the change report.
+
+    Args:
+        folder (str): The folder with the current source *.xlsx files.
+        source_lang (str): The source language column.
+        target_lang (str): The target language column, for the newly translated and reverted volumes.
+        previous_folder (str): The folder with the previous drop. If None, the snapshot is compared instead.
+        snapshot_path (str): The snapshot of the previous run. After the comparison the current folder is saved to
+            it, so it becomes the baseline of the next run.
+        output_path (str): Where to save the formatted change report. If None, it's only returned.
+        key_column (str): The column that identifies the rows of a sheet.
+        count_mode (str): "Chinese" or "Words".
+
+    Returns:
+        DataFrame: The change report, or None when there was nothing to compare with yet.
+    """
+    report_core.set_counting_options(count_mode=count_mode)
+    report_core.start_string_count_memo()
+    old_snapshot = None
+    if previous_folder:
+        old_snapshot = take_snapshot(report_core.get_xlsx_file_paths_in_folder(previous_folder), source_lang,
+                                     target_lang, key_column, folder=previous_folder)
+    elif snapshot_path and os.path.exists(snapshot_path):
+        old_snapshot = load_snapshot(snapshot_path, source_lang, target_lang, key_column)
+
+    file_list = report_core.get_xlsx_file_paths_in_folder(folder)
+    new_snapshot = take_snapshot(file_list, source_lang, target_lang, key_column,
+                                 None if previous_folder else old_snapshot, folder)
+    if snapshot_path:
+        save_snapshot(new_snapshot, snapshot_path, source_lang, target_lang, key_column)
+    if old_snapshot is None:
+        return None
+
+    delta = compare_snapshots(old_snapshot, new_snapshot)
+    if output_path:
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        report_core.format_and_save_to_excel(delta, output_path)
+    return delta
@@ -0,0 +1,204 @@
+import csv
+import hashlib
+import importlib.util
+import os
+import shutil
+
+# The columns of the part files, the detail file starts with 'Batch'
+part_headers = ['File', 'Sheet', 'Row', 'Source', 'Characters', 'Placeholders', 'Translated']
+detail_headers = ['Batch'] + part_headers
+# Rows per row group of a Parquet detail file
+detail_chunk_rows = 50000
+
+
+def get_parts_folder(detail_path):
+    # The part files of one run live next to the detail file until they are merged into it
+    return f'{detail_path}.parts'
+
+
+def get_part_path(detail_path, excel_file):
+    # One part file per workbook, named after its full path so workbooks with the same name don't share one
+    path_hash = hashlib.sha1(os.path.abspath(excel_file).encode('utf-8', 'surrogatepass')).hexdigest()[:16]
+    return os.path.join(get_parts_folder(detail_path), f'{path_hash}.csv')
+
+
+def check_detail_path(detail_path):
+    """
+    Checks that the detail file can be written, before the files are processed.
+
+    Raises:
+        ValueError: If the extension isn't .csv or .parquet, or Parquet can't be written here.
+    """
+    extension = os.path.splitext(detail_path)[1].lower()
+    if extension not in ('.csv', '.parquet'):
+        raise ValueError(f"Unknown detail format '{extension}' of {detail_path}, use .csv or .parquet")
+    if extension == '.parquet' and importlib.util.find_spec('pyarrow') is None:
+        raise ValueError("Parquet detail export needs pyarrow installed: pip install pyarrow")
+
+
+def start_parts(detail_path):
+    # Part files left over by an interrupted run would end up in this one
+    remove_parts(detail_path)
+    os.makedirs(get_parts_folder(detail_path))
+
+
+def remove_parts(detail_path):
+    shutil.rmtree(get_parts_folder(detail_path), ignore_errors=True)
+
+
+class DetailPartWriter:
+    """
+    Writes the detail rows of one workbook to its part file as they are counted, so memory doesn't grow with the
+    number of rows.
+
+    A row is written if its source isn't empty and it's untranslated, or it has at least placeholder_minimum
+    placeholders.
+
+    Args:
+        path (str): The part file, see get_part_path().
+        file_name (str): The workbook name for the 'File' column.
+        placeholder_minimum (int): Also write translated rows with this many placeholders, None writes untranslated
+            rows only.
+    """
+
+    def __init__(self, path, file_name, placeholder_minimum=None):
+        self.path = path
+        self.file_name = file_name
+        self.placeholder_minimum = placeholder_minimum
+        self.part_file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.part_file)
+
+    def write_row(self, sheet_name, row_number, source, characters, placeholders, translated):
+        """
+        Args:
+            sheet_name (str): The sheet of the row.
+            row_number (int): The worksheet row, 2 for the first row below the header.
+            source: The source cell value, NaN for an empty cell.
+            characters (int): The counted characters or words of the source.
+            placeholders (int): The placeholders in the source.
+            translated (bool): Whether the target cell is filled.
+        """
+        if source != source:  # NaN, nothing to translate
+            return
+        if translated and (self.placeholder_minimum is None or placeholders < self.placeholder_minimum):
+            return
+        self.writer.writerow([self.file_name, sheet_name, row_number, source, characters, placeholders,
+                              int(translated)])
+
+    def write_rows(self, sheet_name, rows):
+        # (source, characters, placeholders, translated) tuples of a whole sheet, in worksheet order
+        for row_number, (source, characters, placeholders, translated) in enumerate(rows, 2):
+            self.write_row(sheet_name, row_number, source, characters, placeholders, translated)
+
+    def close(self):
+        self.part_file.close()
+
+    def discard(self):
+        # The workbook failed, its report row is missing too
+        self.part_file.close()
+        os.remove(self.path)
+
+
+def assign_batches(report, batch_headers):
+    """
+    Splits the sheets of a report into as many batches as there are batch columns, in report order and with about
+    the same untranslated volume each, and fills the batch column of every sheet with its untranslated volume.
+
+    A sheet is never split between batches. The 'Total' row gets the volume of every batch.
+
+    Args:
+        report (DataFrame): A report with its 'Total' row, changed in place.
+        batch_headers (list): The batch columns, e.g. 'Batch 1' to 'Batch 6'.
+
+    Returns:
+        dict: (file name, sheet name) mapped to the batch number of the sheet, from 1.
+    """
+    sheets = report.index[report['file'] != 'Total']
+    untranslated = [int(report.at[index, 'Not_translated']) for index in sheets]
+    total = sum(untranslated)
+    batch_count = len(batch_headers)
+    batch_totals = [0] * batch_count
+    sheet_batches = {}
+    done = 0
+    for index, volume in zip(sheets, untranslated):
+        # The batch the middle of the sheet falls into, so big sheets don't all land in the later batch
+        batch = min(int((done + volume / 2) * batch_count / total), batch_count - 1) if total else 0
+        done += volume
+        batch_totals[batch] += volume
+        sheet_batches[report.at[index, 'file'], report.at[index, 'Key']] = batch + 1
+        report.at[index, batch_headers[batch]] = volume
+    total_rows = report.index[report['file'] == 'Total']
+    for header, batch_total in zip(batch_headers, batch_totals):
+        report.loc[total_rows, header] = batch_total
+    return sheet_batches
+
+
+def iter_detail_rows(part_paths, sheet_batches):
+    # The rows of the part files in order, with their batch in front
+    for part_path in part_paths:
+        with open(part_path, newline='', encoding='utf-8') as part_file:
+            for row in csv.reader(part_file):
+                yield [sheet_batches.get((row[0], row[1]), '')] + row
+
+
+def write_detail_csv(rows, detail_path):
+    with open(detail_path, 'w', newline='', encoding='utf-8') as detail_file:
+        writer = csv.writer(detail_file)
+        writer.writerow(detail_headers)
+        writer.writerows(rows)
+
+
+def write_detail_parquet(rows, detail_path):
+    # A row group per chunk of rows, so they never have to fit in memory at once
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([('Batch', pa.int64()), ('File', pa.string()), ('Sheet', pa.string()), ('Row', pa.int64()),
+                        ('Source', pa.string()), ('Characters', pa.int64()), ('Placeholders', pa.int64()),
+                        ('Translated', pa.bool_())])
+    # The part files hold text, the batch is an int or '' for a sheet without one
+    converters = [lambda value: None if value == '' else int(value), str, str, int, str, int, int,
+                  lambda value: value == '1']
+    with pq.ParquetWriter(detail_path, schema) as writer:
+        chunk = []
+        for row in rows:
+            chunk.append({header: convert(value) for header, convert, value in zip(detail_headers, converters, row)})
+            if len(chunk) == detail_chunk_rows:
+                writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+                chunk = []
+        if chunk:
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+
+
+def merge_parts(file_list, detail_path, sheet_batches):
+    """
+    Writes the part files of the workbooks into the detail file, in the order of file_list, and removes them.
+
+    Args:
+        file_list (list): The workbooks of the report, the ones without a part file (failed or skipped) are left out.
+        detail_path (str): The .csv or .parquet detail file.
+        sheet_batches (dict): The batches of assign_batches().
+
+    Returns:
+        int: The number of detail rows.
+    """
+    part_paths = [path for path in (get_part_path(detail_path, excel_file) for excel_file in file_list)
+                  if os.path.exists(path)]
+    output_dir = os.path.dirname(detail_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    row_count = 0
+
+    def counted(rows):
+        nonlocal row_count
+        for row in rows:
+            row_count += 1
+            yield row
+
+    rows = counted(iter_detail_rows(part_paths, sheet_batches))
+    if os.path.splitext(detail_path)[1].lower() == '.parquet':
+        write_detail_parquet(rows, detail_path)
+    else:
+        write_detail_csv(rows, detail_path)
+    remove_parts(detail_path)
+    return row_count
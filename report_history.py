@@ -0,0 +1,165 @@
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+default_history_path = os.path.join(os.getcwd(), 'cache', 'report_history.sqlite')
+# The options that change the completeness numbers, runs are stored and compared under these only. Placeholder
+# patterns and fuzzy bands change other columns
+history_option_names = ('unique_or_all', 'count_mode')
+
+
+def get_options_key(options):
+    return json.dumps({name: options[name] for name in history_option_names}, sort_keys=True)
+
+
+class ReportHistory:
+    """
+    SQLite store of the per-sheet rows of every report, for completeness trends without opening old workbooks.
+
+    Every report is a run (timestamp, folder, language pair and counting options) with one row per sheet. Runs
+    with several target languages are stored as a run per language.
+    """
+
+    def __init__(self, path=default_history_path):
+        self.path = path
+        history_dir = os.path.dirname(path)
+        if history_dir:
+            os.makedirs(history_dir, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript('''
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY, timestamp TEXT, folder TEXT, source TEXT, target TEXT, options TEXT);
+            CREATE TABLE IF NOT EXISTS sheets (
+                run_id INTEGER REFERENCES runs (id), file TEXT, sheet TEXT, source_count INTEGER,
+                translated INTEGER, not_translated INTEGER, completeness INTEGER, variables_ratio INTEGER,
+                source_unique INTEGER);
+            CREATE INDEX IF NOT EXISTS runs_pair ON runs (source, target, options, timestamp);
+            CREATE INDEX IF NOT EXISTS runs_folder ON runs (folder, source, target, options, timestamp);
+            CREATE INDEX IF NOT EXISTS sheets_run ON sheets (run_id, file);
+            CREATE INDEX IF NOT EXISTS sheets_file ON sheets (file, run_id);
+        ''')
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def record_run(self, report, folder, source_lang, target_lang, options, timestamp=None):
+        """
+        Appends the sheets of a report.
+
+        Args:
+            report (DataFrame or dict): A report with its 'Total' row, or target languages mapped to reports.
+            folder (str): The source folder of the report.
+            source_lang (str): The source language column.
+            target_lang (str): The target language column, ignored for a dict of reports.
+            options (dict): The counting options, see report_core.get_result_options(). Only history_option_names
+                are stored.
+            timestamp (str): ISO time of the run, now by default.
+        """
+        timestamp = timestamp or datetime.now().isoformat(timespec='seconds')
+        reports = report if isinstance(report, dict) else {target_lang: report}
+        options_string = get_options_key(options)
+        with self.connection:
+            for target, target_report in reports.items():
+                run_id = self.connection.execute(
+                    'INSERT INTO runs (timestamp, folder, source, target, options) VALUES (?, ?, ?, ?, ?)',
+                    (timestamp, os.path.abspath(folder), source_lang, target, options_string)).lastrowid
+                sheets = target_report[target_report['file'] != 'Total']
+                self.connection.executemany(
+                    'INSERT INTO sheets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    ((run_id, str(row['file']), str(row['Key']), as_int(row['Source Wordcount']),
+                      as_int(row['Translated']), as_int(row['Not_translated']), as_int(row['Completeness']),
+                      as_int(row['Variables ratio']), as_int(row['Source Unique']))
+                     for _, row in sheets.iterrows()))
+
+    def completeness_over_time(self, source_lang, target_lang, options, by_file=False, file_name=None, since=None,
+                               folder=None):
+        """
+        Returns the completeness of every run of a language pair, for the whole folder or per file.
+
+        Args:
+            source_lang (str): The source language column.
+            target_lang (str): The target language column, None for all of them.
+            options (dict): Only runs counted with the same history_option_names are comparable.
+            by_file (bool): A row per file of every run instead of a row per run.
+            file_name (str): Only this file.
+            since (str): Only runs from this ISO date or time on.
+            folder (str): Only the runs of this source folder, so a report of another folder (a test folder or a
+                partial drop) doesn't break the trend. None for the runs of every folder.
+
+        Returns:
+            list: Dicts with 'timestamp', 'target', 'file' (None for the folder), 'source', 'translated',
+                'not_translated' and 'completeness' (percent), oldest first.
+        """
+        conditions = ['runs.source = ?', 'runs.options = ?']
+        parameters = [source_lang, get_options_key(options)]
+        if target_lang is not None:
+            conditions.append('runs.target = ?')
+            parameters.append(target_lang)
+        if file_name is not None:
+            conditions.append('sheets.file = ?')
+            parameters.append(file_name)
+        if since is not None:
+            conditions.append('runs.timestamp >= ?')
+            parameters.append(since)
+        if folder is not None:
+            conditions.append('runs.folder = ?')
+            parameters.append(os.path.abspath(folder))
+        file_column = 'sheets.file' if by_file else 'NULL'
+        query = (f'SELECT runs.timestamp, runs.target, {file_column}, SUM(sheets.source_count), '
+                 f'SUM(sheets.translated), SUM(sheets.not_translated) '
+                 f'FROM runs JOIN sheets ON sheets.run_id = runs.id WHERE {" AND ".join(conditions)} '
+                 f'GROUP BY runs.id{", sheets.file" if by_file else ""} ORDER BY runs.timestamp, runs.id')
+        return [{'timestamp': timestamp, 'target': target, 'file': file, 'source': source,
+                 'translated': translated, 'not_translated': not_translated,
+                 'completeness': round(translated / source * 100, 1) if source else 0.0}
+                for timestamp, target, file, source, translated, not_translated
+                in self.connection.execute(query, parameters)]
+
+
+def as_int(value):
+    # Report cells are objects, missing ones are NaN or ''
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def add_burn_down(points):
+    """
+    Adds the burn-down velocity to completeness points of completeness_over_time().
+
+    Every point gets 'velocity', the untranslated volume done per day since the previous point of the same target
+    and file, and 'days_left' at that pace (None when nothing got done).
+
+    Returns:
+        list: The same points.
+    """
+    previous = {}
+    for point in points:
+        key = (point['target'], point['file'])
+        point['velocity'] = point['days_left'] = None
+        if key in previous:
+            last = previous[key]
+            days = (datetime.fromisoformat(point['timestamp']) -
+                    datetime.fromisoformat(last['timestamp'])).total_seconds() / 86400
+            if days > 0:
+                point['velocity'] = round((last['not_translated'] - point['not_translated']) / days, 1)
+                if point['velocity'] > 0:
+                    point['days_left'] = round(point['not_translated'] / point['velocity'], 1)
+        previous[key] = point
+    return points
+
+
+def format_history(points):
+    # A text table of the points, like the other console output
+    lines = [f"{'timestamp':<20} {'target':<7} {'file':<30} {'source':>9} {'translated':>10} {'complete':>9} "
+             f"{'per day':>9} {'days left':>9}"]
+    for point in points:
+        velocity = f"{point['velocity']:.0f}" if point['velocity'] is not None else '-'
+        days_left = f"{point['days_left']:.1f}" if point['days_left'] is not None else '-'
+        lines.append(f"{point['timestamp']:<20} {point['target']:<7} {point['file'] or 'all files':<30} "
+                     f"{point['source']:>9} {point['translated']:>10} {point['completeness']:>8.1f}% "
+                     f"{velocity:>9} {days_left:>9}")
+    return '\n'.join(lines)
@@ -0,0 +1,97 @@
+import importlib.util
+import os
+
+from report_core import LazyModule
+
+pd = LazyModule('pandas', globals(), 'pd')
+
+
+def make_export_dataframe(report):
+    """
+    Turns a report into a plain table for other tools to read.
+
+    The 'Total' row is left out, so summing a column doesn't count everything twice, and the columns get numeric
+    types instead of the report's object columns. Several target languages become one table with a 'Target' column.
+
+    Args:
+        report (DataFrame or dict): A report from process_list_of_excels(), or target languages mapped to reports.
+
+    Returns:
+        DataFrame: One row per sheet, with numbers for the counts, 'Completeness' and 'Variables ratio'.
+    """
+    if isinstance(report, dict):
+        frames = [make_export_dataframe(target_report).assign(Target=target_lang)
+                  for target_lang, target_report in report.items()]
+        export = pd.concat(frames, ignore_index=True)
+        return export[['Target'] + [column for column in export.columns if column != 'Target']]
+    export = report[report['file'] != 'Total'].reset_index(drop=True)
+    return export.infer_objects()
+
+
+def write_csv(export, path):
+    export.to_csv(path, index=False, encoding='utf-8')
+
+
+def write_jsonl(export, path):
+    # One JSON object per sheet, empty cells are null
+    export.to_json(path, orient='records', lines=True, force_ascii=False)
+
+
+def write_parquet(export, path):
+    export.to_parquet(path, index=False)
+
+
+def has_parquet_engine():
+    # pandas writes Parquet with either of the optional packages
+    return any(importlib.util.find_spec(package) is not None for package in ('pyarrow', 'fastparquet'))
+
+
+# File extensions mapped to the functions that write an export table, add an entry to support another format
+output_sinks = {
+    '.csv': write_csv,
+    '.jsonl': write_jsonl,
+    '.parquet': write_parquet,
+}
+
+
+def get_sink(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in output_sinks:
+        raise ValueError(f"Unknown export format '{extension}' of {path}, use one of: {', '.join(output_sinks)}")
+    if extension == '.parquet' and not has_parquet_engine():
+        raise ValueError("Parquet export needs pyarrow installed: pip install pyarrow")
+    return output_sinks[extension]
+
+
+def export_report(report, paths):
+    """
+    Writes the report to every path, in the format of its extension (see output_sinks).
+
+    Args:
+        report (DataFrame or dict): A report, or target languages mapped to reports.
+        paths (list): The files to write.
+
+    Raises:
+        ValueError: If a format is unknown or can't be written here, before anything is written.
+    """
+    sinks = [(get_sink(path), path) for path in paths]
+    export = make_export_dataframe(report)
+    for sink, path in sinks:
+        output_dir = os.path.dirname(path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        sink(export, path)
+        print(f"Exported to {path}")
+
+
+def print_summary(report):
+    # The totals of the report, one line per target language
+    reports = report if isinstance(report, dict) else {None: report}
+    for target_lang, target_report in reports.items():
+        sheets = target_report[target_report['file'] != 'Total']
+        total = target_report.iloc[-1]
+        source, translated = total['Source Wordcount'], total['Translated']
+        completeness = f"{translated / source:.1%}" if source else "-"
+        prefix = f"{target_lang}: " if target_lang is not None else ""
+        print(f"{prefix}{sheets['file'].nunique()} file(s), {len(sheets)} sheet(s), source {source}, "
+              f"translated {translated} ({completeness}), not translated {total['Not_translated']}")
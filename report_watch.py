@@ -0,0 +1,130 @@
+import os
+import time
+
+import report_core
+
+
+def scan_folder(folder):
+    """
+    Returns the *.xlsx files of a folder (and its subfolders with --subfolders) with their size and modification
+    time, in name order.
+
+    Excel's '~$' lock files of workbooks that are open are left out.
+    """
+    files = {}
+    try:
+        for entry in report_core.iter_xlsx_entries(folder, report_core.scan_subfolders):
+            if not entry.name.startswith('~$'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    # Removed or locked since the folder was listed, the next scan sees it again
+                    continue
+                files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+    except FileNotFoundError:
+        print(f"Folder not found: {folder}")
+    except OSError as e:
+        print(f"Could not read folder {folder}: {e}")
+    return files
+
+
+def save_report_atomically(report, output_path):
+    # Readers never see a half-written report: it's written next to the old one and swapped in
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    temp_path = f'{output_path}.{os.getpid()}.tmp'
+    report_core.format_and_save_to_excel(report, temp_path)
+    try:
+        os.replace(temp_path, output_path)
+    except OSError:
+        os.remove(temp_path)
+        raise
+
+
+def get_totals(report):
+    total_row = report.iloc[-1]
+    return {column: total_row[column] for column in ('Source Wordcount', 'Translated', 'Not_translated')}
+
+
+def watch_folder(folder, source_lang, target_lang, output_path, interval=2.0, debounce=5.0, workers=1, cache=None,
+                 stop_event=None):
+    """
+    Keeps the report of a folder up to date while workbooks are added, changed and removed.
+
+    The folder is polled every `interval` seconds. A changed file is only processed once its size and modification
+    time have stayed the same for `debounce` seconds, so workbooks that are still being copied or saved are not read
+    half-way. The results of the other files are kept from the previous update, and the report is rewritten
+    atomically after every update.
+
+    Args:
+        folder (str): The folder with source *.xlsx files.
+        source_lang (str): The source language column.
+        target_lang (str): The target language column.
+        output_path (str): The report to keep up to date.
+        interval (float): Seconds between two scans of the folder.
+        debounce (float): Seconds a file has to stay unchanged before it's processed.
+        workers (int): Worker processes for the changed files, see process_files().
+        cache (ReportCache): If given, a restarted watch only processes the files changed since the last run.
+        stop_event (threading.Event): Stops the watch when set. Without it, the watch runs until Ctrl+C.
+    """
+    report_core.source_folder = folder
+    report_headers = report_core.with_optional_headers(report_core.report_headers_variable)
+    results = {}  # file path -> (fingerprint, DataFrame of its sheets)
+    changes = {}  # file path -> (fingerprint, time it was first seen)
+    totals = None
+    print(f"Watching {folder} for changes, press Ctrl+C to stop")
+    try:
+        while stop_event is None or not stop_event.is_set():
+            now = time.monotonic()
+            files = scan_folder(folder)
+
+            removed = [file_path for file_path in results if file_path not in files]
+            for file_path in removed:
+                del results[file_path]
+            for file_path in list(changes):
+                if file_path not in files:
+                    del changes[file_path]
+            for file_path, fingerprint in files.items():
+                if file_path in results and results[file_path][0] == fingerprint:
+                    changes.pop(file_path, None)
+                elif file_path not in changes or changes[file_path][0] != fingerprint:
+                    changes[file_path] = (fingerprint, now)
+
+            settled = [file_path for file_path in files
+                       if file_path in changes and now - changes[file_path][1] >= debounce]
+            if settled or removed:
+                errors = []
+                file_results = report_core.process_files(settled, source_lang, target_lang, report_headers, workers,
+                                                         errors, cache)
+                failed = {file_path for file_path, _ in errors}
+                file_results = iter(file_results)
+                for file_path in settled:
+                    # A file that failed (e.g. a broken workbook) is left out until it changes again
+                    results[file_path] = (changes.pop(file_path)[0],
+                                          None if file_path in failed else next(file_results))
+
+                report = report_core.combine_file_results(
+                    report_core.create_report_dataframe(report_core.report_headers_variable),
+                    [results[file_path][1] for file_path in files
+                     if file_path in results and results[file_path][1] is not None],
+                    report_core.report_headers_variable)
+                new_totals = get_totals(report)
+                try:
+                    save_report_atomically(report, output_path)
+                except OSError as e:
+                    # E.g. the report is open in Excel on Windows, it's saved again after the next change
+                    print(f"Could not save {output_path}: {e}")
+                changed_totals = ', '.join(
+                    f"{column} {value}" + (f" ({value - totals[column]:+})" if totals is not None else "")
+                    for column, value in new_totals.items())
+                print(f"{time.strftime('%H:%M:%S')}: {len(settled)} file(s) processed, {len(removed)} removed. "
+                      f"{changed_totals}")
+                totals = new_totals
+
+            if stop_event is not None:
+                stop_event.wait(interval)
+            else:
+                time.sleep(interval)
+    except KeyboardInterrupt:
+        print("Stopped watching")
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import sqlite3
+
+from report_core import LazyModule, get_file_name, iter_selected_rows
+
+np = LazyModule('numpy', globals(), 'np')
+pd = LazyModule('pandas', globals(), 'pd')
+
+default_sidecar_folder = os.path.join(os.getcwd(), 'cache', 'sidecars')
+
+# Bump when the layout or the content of the sidecar files changes, older sidecars are then extracted again.
+# 2: sheets with a stale size record were extracted short before
+sidecar_format_version = 2
+
+
+def sidecar_path(excel_file, sidecar_folder=default_sidecar_folder):
+    # The path hash keeps same-named workbooks from different folders apart
+    file_path = os.path.abspath(excel_file)
+    path_hash = hashlib.sha1(file_path.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(sidecar_folder, f'{os.path.basename(file_path)}.{path_hash}.sqlite')
+
+
+def source_fingerprint(excel_file):
+    stat = os.stat(excel_file)
+    return json.dumps([sidecar_format_version, stat.st_size, stat.st_mtime_ns])
+
+
+def is_sidecar_current(excel_file, sidecar_folder=default_sidecar_folder):
+    path = sidecar_path(excel_file, sidecar_folder)
+    if not os.path.isfile(path):
+        return False
+    connection = sqlite3.connect(path)
+    try:
+        row = connection.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+    except sqlite3.DatabaseError:
+        return False
+    finally:
+        connection.close()
+    return row is not None and row[0] == source_fingerprint(excel_file)
+
+
+def sqlite_value(value):
+    if value is np.nan:
+        return None
+    if isinstance(value, (str, int, float)):
+        return value
+    # Dates, times and the like are only ever counted as text
+    return str(value)
+
+
+def extract_to_sidecar(excel_file, sidecar_folder=default_sidecar_folder):
+    """
+    Converts every column of every sheet of an Excel file into a SQLite sidecar file.
+
+    Values are stored the way pandas.read_excel() reads them, empty cells as NULL.
+
+    Args:
+        excel_file (str): The path of the Excel file.
+        sidecar_folder (str): The folder for sidecar files.
+
+    Returns:
+        str: The path of the sidecar file.
+    """
+    from openpyxl import load_workbook
+
+    path = sidecar_path(excel_file, sidecar_folder)
+    os.makedirs(sidecar_folder, exist_ok=True)
+    fingerprint = source_fingerprint(excel_file)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    connection = sqlite3.connect(temp_path)
+    wb = load_workbook(excel_file, read_only=True, data_only=True, keep_links=False)
+    try:
+        connection.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+        connection.execute('CREATE TABLE sheets (position INTEGER PRIMARY KEY, name TEXT, header TEXT)')
+        for position, ws in enumerate(wb.worksheets):
+            # The size stored in the sheet can be stale, see report_core.iter_sheet_columns()
+            ws.reset_dimensions()
+            rows = ws.iter_rows(values_only=True)
+            header = list(next(rows, ()))
+            connection.execute('INSERT INTO sheets VALUES (?, ?, ?)', (position, ws.title, json.dumps(header,
+                                                                                                      default=str)))
+            columns = [f'c{index}' for index in range(len(header))]
+            connection.execute(f'CREATE TABLE sheet_{position} (row INTEGER PRIMARY KEY'
+                               f'{"".join(", " + column for column in columns)})')
+            if not columns:
+                continue
+            insert = f'INSERT INTO sheet_{position} VALUES (?{", ?" * len(columns)})'
+            selected_rows = iter_selected_rows(rows, list(range(len(header))))
+            connection.executemany(insert, ((row_index,) + tuple(map(sqlite_value, values))
+                                            for row_index, values in enumerate(selected_rows)))
+        connection.execute("INSERT INTO meta VALUES ('source', ?)", (fingerprint,))
+        connection.commit()
+    finally:
+        wb.close()
+        connection.close()
+    # Readers never see a half-written sidecar
+    os.replace(temp_path, path)
+    return path
+
+
+def load_sheet_columns_from_sidecar(excel_file, columns, sidecar_folder=default_sidecar_folder, required=None):
+    """
+    Same as report_core.load_sheet_columns(), but reads the sidecar file, extracting it first if it's missing or
+    older than the Excel file.
+    """
+    if not is_sidecar_current(excel_file, sidecar_folder):
+        extract_to_sidecar(excel_file, sidecar_folder)
+
+    filename_with_extension = get_file_name(excel_file)
+    unique_columns = list(dict.fromkeys(columns))
+    if required is None:
+        required = unique_columns
+    sheets_data = {}
+    connection = sqlite3.connect(sidecar_path(excel_file, sidecar_folder))
+    try:
+        for position, sheet_name, header in connection.execute('SELECT position, name, header FROM sheets '
+                                                               'ORDER BY position').fetchall():
+            header = json.loads(header)
+            missing = [column for column in unique_columns if column not in header]
+            if any(column in missing for column in required):
+                print(f"{filename_with_extension}: sheet '{sheet_name}' has no column "
+                      f"{', '.join(map(str, missing))}, skipped")
+                continue
+            found = [column for column in unique_columns if column in header]
+            selected = ', '.join(f'c{header.index(column)}' for column in found)
+            records = connection.execute(f'SELECT {selected} FROM sheet_{position} ORDER BY row').fetchall()
+            data = pd.DataFrame.from_records(records, columns=found)
+            # NULL comes back as None, pandas.read_excel() gives NaN
+            data = data.astype(object).where(data.notna(), np.nan)
+            sheets_data[sheet_name] = data[[column for column in columns if column in found]]
+    finally:
+        connection.close()
+    return sheets_data
+
+
+def extract_folder(file_list, sidecar_folder=default_sidecar_folder, force=False):
+    # Returns the number of sidecar files written
+    extracted = 0
+    for file_path in file_list:
+        if force or not is_sidecar_current(file_path, sidecar_folder):
+            print(f"Extracting {os.path.basename(file_path)}")
+            extract_to_sidecar(file_path, sidecar_folder)
+            extracted += 1
+    return extracted